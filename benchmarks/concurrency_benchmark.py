@@ -0,0 +1,141 @@
+"""
+Compare the async views served through Django's ASGI handler with the sync views served through the WSGI handler
+under concurrent clients. Both handlers run in-process against a throwaway test database, requests carry a real JWT.
+
+Run from the project root:
+    python -m benchmarks.concurrency_benchmark [--requests 400] [--concurrency 50] [--rows 1000] [--latency-ms 2]
+
+--latency-ms adds a sleep to every query to mimic a database across the network, which is where an event loop
+frees worker threads. The schedule cache is disabled, so every request reaches the database.
+"""
+import argparse
+import asyncio
+import statistics
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.asgi import ASGIHandler  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.backends.signals import connection_created  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from benchmarks.data import seed_schedule  # noqa: E402
+
+SCHEDULE_PATHS = {'wsgi': '/weekly-schedule/', 'asgi': '/async/weekly-schedule/'}
+
+
+def create_authorization():
+    from django.contrib.auth.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user = User.objects.create_user(username='benchmark', password='benchmark-password')
+    return f'Bearer {AccessToken.for_user(user)}'
+
+
+def add_latency(latency):
+    def sleep_then_execute(execute, sql, params, many, context):
+        timer.sleep(latency)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(sleep_then_execute)
+
+    connection_created.connect(install, weak=False)
+
+
+def run_wsgi(requests, concurrency, authorization):
+    application = WSGIHandler()
+
+    def request(_):
+        environ = {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': SCHEDULE_PATHS['wsgi'], 'QUERY_STRING': '',
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_AUTHORIZATION': authorization, 'wsgi.input': BytesIO(), 'wsgi.url_scheme': 'http',
+        }
+        started = timer.perf_counter()
+        statuses = []
+        body = application(environ, lambda status, headers: statuses.append(status))
+        b''.join(body)
+        body.close()
+        assert statuses[0].startswith('200'), statuses[0]
+        return timer.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(request, range(requests)))
+
+
+def run_asgi(requests, concurrency, authorization):
+    application = ASGIHandler()
+
+    async def request(semaphore):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET', 'scheme': 'http',
+            'path': SCHEDULE_PATHS['asgi'], 'raw_path': SCHEDULE_PATHS['asgi'].encode(), 'query_string': b'',
+            'headers': [(b'authorization', authorization.encode()), (b'host', b'testserver')],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        }
+        messages = []
+
+        async def receive():
+            if messages:
+                await asyncio.Event().wait()  # the client never disconnects early
+            messages.append('request')
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        statuses = []
+
+        async def send(message):
+            if message['type'] == 'http.response.start':
+                statuses.append(message['status'])
+
+        async with semaphore:
+            started = timer.perf_counter()
+            await application(scope, receive, send)
+            assert statuses[0] == 200, statuses[0]
+            return timer.perf_counter() - started
+
+    async def main():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(request(semaphore) for _ in range(requests)))
+
+    return asyncio.run(main())
+
+
+def report(name, durations, elapsed):
+    durations = sorted(durations)
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(f"{name:>10} {len(durations) / elapsed:>10.1f} req/s   p50 {statistics.median(durations) * 1000:>8.1f}ms"
+          f"   p95 {p95 * 1000:>8.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    options = parser.parse_args()
+
+    with test_database():
+        seed_schedule(options.rows)
+        authorization = create_authorization()
+        if options.latency_ms:
+            add_latency(options.latency_ms / 1000)
+        connection.close()
+
+        dummy_cache = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+        with override_settings(CACHES=dummy_cache, ALLOWED_HOSTS=['testserver'] + settings.ALLOWED_HOSTS):
+            print(f"{options.requests} requests, {options.concurrency} concurrent clients, {options.rows} rows")
+            for name, run in (('wsgi', run_wsgi), ('asgi', run_asgi)):
+                started = timer.perf_counter()
+                durations = run(options.requests, options.concurrency, authorization)
+                report(name, durations, timer.perf_counter() - started)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+"""
+Synthetic schedules for the benchmarks. Records are spread evenly over the week without overlaps, one per slot of
+`slot_seconds(rows)`; each record leaves the last quarter of its slot free, so writes have room to land.
+"""
+import random
+from datetime import time
+
+from django.core.management.color import no_style
+from django.db import connection
+from manage_schedule.models import Schedule
+
+DAYS = [day for day, _ in Schedule.DAY_CHOICES]
+
+
+def slot_seconds(rows):
+    return 86400 // -(-rows // len(DAYS))
+
+
+def seconds_to_time(seconds):
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+def make_records(rows, seed=0, members=50):
+    """Build `rows` unsaved records in insertion (not display) order. The same seed gives the same schedule."""
+    rng = random.Random(seed)
+    step = slot_seconds(rows)
+    busy = step * 3 // 4
+    records = []
+
+    for number in range(rows):
+        day, slot = DAYS[number % len(DAYS)], number // len(DAYS)
+        start = slot * step + rng.randrange(busy // 4 + 1)
+        records.append(Schedule(id=number + 1, day=day, day_index=Schedule.DAY_INDEX[day],
+                                ids=rng.sample(range(members), rng.randint(1, 3)),
+                                start_time=seconds_to_time(start),
+                                end_time=seconds_to_time(slot * step + busy)))
+    return records
+
+
+def free_interval(rows, number):
+    """The free tail of the slot of record `number` in a schedule of `rows` records, as (day, start, end)."""
+    step = slot_seconds(rows)
+    slot = number // len(DAYS) % (-(-rows // len(DAYS)) - 1)
+    return DAYS[number % len(DAYS)], seconds_to_time(slot * step + step * 3 // 4), seconds_to_time((slot + 1) * step)
+
+
+def seed_schedule(rows, seed=0):
+    """Replace the stored schedule with `make_records(rows, seed)`."""
+    Schedule.objects.all().delete()
+    Schedule.objects.bulk_create(make_records(rows, seed), batch_size=5000)
+
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), [Schedule]):
+            cursor.execute(sql)
@@ -0,0 +1,121 @@
+"""
+Compare a new database connection per request, persistent connections (CONN_MAX_AGE) and the psycopg 3 connection
+pool on a small call: concurrent DeleteRecord requests for a missing record (one query, 404) through the WSGI
+handler, in-process against a throwaway test database.
+
+Run from the project root:
+    python -m benchmarks.pool_benchmark [--requests 2000] [--concurrency 16] [--pool-size 8] [--connect-latency-ms 0]
+
+The local database stands in for the real one: it accepts connections faster than a server across the network (TCP,
+TLS, authentication), which --connect-latency-ms adds back to every new connection.
+"""
+import argparse
+import logging
+import statistics
+import time as timer
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.core.handlers.wsgi import WSGIHandler  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from manage_schedule.metrics import database_pools  # noqa: E402
+from benchmarks.concurrency_benchmark import create_authorization, report  # noqa: E402
+
+try:
+    import psycopg
+    import psycopg_pool  # noqa: F401
+except ImportError:  # the pool needs psycopg 3
+    psycopg = None
+
+
+def add_connect_latency(latency):
+    connect = psycopg.Connection.connect.__func__
+
+    def slow_connect(cls, *args, **kwargs):
+        timer.sleep(latency)
+        return connect(cls, *args, **kwargs)
+
+    psycopg.Connection.connect = classmethod(slow_connect)
+
+
+def run(requests, concurrency, authorization):
+    application = WSGIHandler()
+
+    def request(_):
+        environ = {
+            'REQUEST_METHOD': 'DELETE', 'PATH_INFO': '/delete-record/', 'QUERY_STRING': 'record_id=0',
+            'SERVER_NAME': 'testserver', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_AUTHORIZATION': authorization, 'wsgi.input': BytesIO(), 'wsgi.url_scheme': 'http',
+        }
+        started = timer.perf_counter()
+        statuses = []
+        body = application(environ, lambda status, headers: statuses.append(status))
+        b''.join(body)
+        body.close()
+        assert statuses[0].startswith('404'), statuses[0]
+        return timer.perf_counter() - started
+
+    def close(_):
+        connection.close()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        durations = list(executor.map(request, range(requests)))
+        # Persistent connections belong to the worker threads.
+        list(executor.map(close, range(concurrency * 4)))
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--pool-size', type=int, default=8)
+    parser.add_argument('--connect-latency-ms', type=float, default=0)
+    options = parser.parse_args()
+    # Every request is a 404 on purpose.
+    logging.getLogger('django.request').setLevel(logging.ERROR)
+
+    database = connections.settings['default']
+    modes = [('new', {'CONN_MAX_AGE': 0}), ('persistent', {'CONN_MAX_AGE': None})]
+    if psycopg is None:
+        print('psycopg 3 with psycopg[pool] is not installed, skipping the pool.')
+    else:
+        modes.append(('pool', {'CONN_MAX_AGE': 0, 'OPTIONS': {
+            **database['OPTIONS'], 'pool': {'min_size': options.pool_size, 'max_size': options.pool_size}}}))
+        if options.connect_latency_ms:
+            add_connect_latency(options.connect_latency_ms / 1000)
+
+    with test_database():
+        authorization = create_authorization()
+        connection.close()
+
+        with override_settings(ALLOWED_HOSTS=['testserver'] + settings.ALLOWED_HOSTS):
+            print(f"{options.requests} requests, {options.concurrency} concurrent clients")
+            for name, database_settings in modes:
+                # Every thread's connection reads the same settings dict.
+                original = {key: database[key] for key in database_settings}
+                database.update(database_settings)
+                try:
+                    started = timer.perf_counter()
+                    durations = run(options.requests, options.concurrency, authorization)
+                    report(name, durations, timer.perf_counter() - started)
+
+                    for pool in database_pools().values():
+                        stats = pool.get_stats()
+                        print(f"{'':>10} waited for a connection {stats.get('requests_queued', 0)} times, "
+                              f"{stats.get('requests_wait_ms', 0) / max(stats.get('requests_num', 1), 1):.2f}ms "
+                              f"on average, opened {stats.get('connections_num', 0)} connections")
+                finally:
+                    if database_pools():
+                        connection.close_pool()
+                    database.update(original)
+
+
+if __name__ == '__main__':
+    main()
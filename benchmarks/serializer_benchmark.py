@@ -0,0 +1,52 @@
+"""
+Compare WeeklyScheduleSerializer with the lean build_weekly_schedule on in-memory schedules, and the time DRF's
+JSONRenderer, FastJSONRenderer and MessagePackRenderer take to render the result.
+
+Run from the project root:
+    python -m benchmarks.serializer_benchmark [rows ...]
+"""
+import sys
+import time as timer
+
+from benchmarks import setup_django
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from benchmarks.data import make_records  # noqa: E402
+from manage_schedule.models import Schedule  # noqa: E402
+from manage_schedule.renderers import FastJSONRenderer, MessagePackRenderer, msgpack  # noqa: E402
+from manage_schedule.serializers import WeeklyScheduleSerializer, build_weekly_schedule  # noqa: E402
+
+
+def best_of(repeat, function):
+    timings = []
+    for _ in range(repeat):
+        started = timer.perf_counter()
+        result = function()
+        timings.append(timer.perf_counter() - started)
+    return min(timings), result
+
+
+def main(sizes):
+    print(f"{'rows':>8} {'serializer':>12} {'lean':>10} {'speedup':>8} {'json':>10} {'orjson':>10} {'msgpack':>10}")
+
+    for rows in sizes:
+        records = make_records(rows)
+        # The database returns these rows already ordered by (day_index, start_time).
+        slots = sorted(((record.id, record.day, record.start_time, record.end_time, record.ids) for record in records),
+                       key=lambda slot: (Schedule.DAY_INDEX[slot[1]], slot[2]))
+
+        legacy_time, legacy = best_of(3, lambda: WeeklyScheduleSerializer(records).data)
+        lean_time, lean = best_of(3, lambda: build_weekly_schedule(slots))
+        json_time, rendered = best_of(3, lambda: JSONRenderer().render(lean))
+        fast_time, fast_rendered = best_of(3, lambda: FastJSONRenderer().render(lean))
+        assert rendered == fast_rendered == JSONRenderer().render(legacy)
+        msgpack_time = best_of(3, lambda: MessagePackRenderer().render(lean))[0] if msgpack else float('nan')
+
+        print(f"{rows:>8} {legacy_time * 1000:>10.1f}ms {lean_time * 1000:>8.1f}ms {legacy_time / lean_time:>7.1f}x "
+              f"{json_time * 1000:>8.1f}ms {fast_time * 1000:>8.1f}ms {msgpack_time * 1000:>8.1f}ms")
+
+
+if __name__ == '__main__':
+    main([int(size) for size in sys.argv[1:]] or [10_000, 100_000])
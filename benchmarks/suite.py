@@ -0,0 +1,213 @@
+"""
+Benchmark the schedule endpoints and the overlap validation on synthetic schedules of growing size, against a
+throwaway test database. Every case reports the median wall time of --repeat runs, then runs once more to count its
+queries and the peak memory allocated by Python (tracemalloc).
+
+Run from the project root:
+    python -m benchmarks.suite [--sizes 1000 10000 100000] [--repeat 5] [--output results.json]
+                               [--baseline benchmarks/baseline.json] [--tolerance 1.5]
+
+With --baseline, a case whose median and fastest run are both slower than `tolerance` times its baseline, which uses
+more memory than that, or which runs more queries, is a regression and the command exits with status 1. The committed
+baseline was recorded on a developer machine; record your own with --output before comparing.
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time as timer
+import tracemalloc
+
+from benchmarks import setup_django, test_database
+
+setup_django()
+
+import django  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+from benchmarks.data import DAYS, free_interval, seed_schedule, seconds_to_time, slot_seconds  # noqa: E402
+from manage_schedule.cache import schedule_changed  # noqa: E402
+from manage_schedule.models import Schedule  # noqa: E402
+from manage_schedule.occupancy import occupancy  # noqa: E402
+from manage_schedule.serializers import WeeklyScheduleSerializer, EditRecordTimelineSerializer  # noqa: E402
+from manage_schedule.utils import find_batch_conflicts  # noqa: E402
+
+
+def expect(response, status_code):
+    assert response.status_code == status_code, (response.status_code, getattr(response, 'data', None))
+    return response
+
+
+def build_cases(client, rows):
+    """Return (name, prepare, run) triples; `run(number)` is timed, `prepare()` runs untimed before it."""
+    busy_end = slot_seconds(rows) * 3 // 4
+
+    def get_schedule(number):
+        expect(client.get('/weekly-schedule/'), 200)
+
+    def serialize_schedule(number):
+        WeeklyScheduleSerializer(Schedule.objects.all()).data
+
+    def validate_timeline(number):
+        # Shrinking a record by a second is valid, so the conflict query runs to completion.
+        slot_start = number // len(DAYS) * slot_seconds(rows)
+        record = Schedule(id=number + 1, day=DAYS[number % len(DAYS)], start_time=seconds_to_time(slot_start),
+                          end_time=seconds_to_time(slot_start + busy_end))
+        end = seconds_to_time(slot_start + busy_end - 1)
+        serializer = EditRecordTimelineSerializer(record, data={'end_time': end.isoformat()}, partial=True)
+        assert serializer.is_valid(), serializer.errors
+
+    def validate_batch(number):
+        intervals = [free_interval(rows, number * 100 + offset) for offset in range(100)]
+        find_batch_conflicts(intervals)
+
+    def create_record(number):
+        day, start, end = free_interval(rows, number)
+        data = {'day': day, 'start_time': start.isoformat(), 'end_time': end.isoformat(), 'ids': [1]}
+        expect(client.post('/create-record/', data, format='json'), 201)
+
+    def update_record(number):
+        end = seconds_to_time(number // len(DAYS) * slot_seconds(rows) + busy_end - 1)
+        expect(client.patch(f'/update-record/?record_id={number + 1}', {'end_time': end.isoformat()}), 200)
+
+    def delete_record(number):
+        expect(client.delete(f'/delete-record/?record_id={rows - number}'), 200)
+
+    def nothing():
+        pass
+
+    return [
+        ('get_week_schedule_cold', cache.clear, get_schedule),
+        ('get_week_schedule_warm', lambda: get_schedule(0), get_schedule),
+        ('weekly_schedule_serializer', nothing, serialize_schedule),
+        ('overlap_validation', nothing, validate_timeline),
+        ('batch_overlap_validation_100', nothing, validate_batch),
+        ('create_record', nothing, create_record),
+        ('update_record', nothing, update_record),
+        ('delete_record', nothing, delete_record),
+    ]
+
+
+def measure(prepare, run, repeat):
+    timings = []
+    for number in range(repeat):
+        prepare()
+        started = timer.perf_counter()
+        run(number)
+        timings.append(timer.perf_counter() - started)
+
+    prepare()
+    with CaptureQueriesContext(connection) as queries:
+        tracemalloc.start()
+        run(repeat)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    return {
+        'wall_ms': round(statistics.median(timings) * 1000, 3),
+        'min_ms': round(min(timings) * 1000, 3),
+        'queries': len(queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run_suite(sizes, repeat):
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(username='benchmark', password='benchmark-password'))
+    results = {}
+
+    print(f"{'rows':>8} {'case':<30} {'median':>11} {'min':>11} {'queries':>8} {'peak':>11}")
+    for rows in sizes:
+        seed_schedule(rows)
+        schedule_changed()
+        cache.clear()
+        occupancy.synced()
+
+        results[str(rows)] = {}
+        for name, prepare, run in build_cases(client, rows):
+            result = results[str(rows)][name] = measure(prepare, run, repeat)
+            print(f"{rows:>8} {name:<30} {result['wall_ms']:>9.2f}ms {result['min_ms']:>9.2f}ms "
+                  f"{result['queries']:>8} {result['peak_kb']:>9.1f}kB")
+
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+
+    with connection.cursor() as cursor:
+        cursor.execute('SHOW server_version')
+        database = f'{connection.vendor} {cursor.fetchone()[0]}'
+
+    return {
+        'commit': commit or None,
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': database,
+        'machine': platform.machine(),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Print every case next to its baseline and return the names of the regressed ones."""
+    regressions = []
+
+    print(f"\n{'rows':>8} {'case':<30} {'baseline':>11} {'now':>11} {'ratio':>7} {'queries':>9} {'peak ratio':>11}")
+    for rows, cases in results['results'].items():
+        for name, result in cases.items():
+            previous = baseline['results'].get(rows, {}).get(name)
+            if previous is None:
+                continue
+
+            ratio = result['wall_ms'] / previous['wall_ms'] if previous['wall_ms'] else 1
+            # Millisecond cases are noisy; a slowdown only counts when the fastest run regressed as well.
+            min_ratio = result['min_ms'] / previous['min_ms'] if previous['min_ms'] else 1
+            peak_ratio = result['peak_kb'] / previous['peak_kb'] if previous['peak_kb'] else 1
+            regressed = (min(ratio, min_ratio) > tolerance or peak_ratio > tolerance
+                         or result['queries'] > previous['queries'])
+            if regressed:
+                regressions.append(f'{rows}/{name}')
+
+            print(f"{rows:>8} {name:<30} {previous['wall_ms']:>9.2f}ms {result['wall_ms']:>9.2f}ms {ratio:>6.2f}x "
+                  f"{previous['queries']:>4}->{result['queries']:<4} {peak_ratio:>10.2f}x"
+                  f"{'  REGRESSION' if regressed else ''}")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Save the results as JSON to this file")
+    parser.add_argument('--baseline', help="Compare the results with a JSON file saved by --output")
+    parser.add_argument('--tolerance', type=float, default=1.5)
+    options = parser.parse_args()
+
+    with test_database():
+        results = {'environment': environment(), 'repeat': options.repeat,
+                   'results': run_suite(options.sizes, options.repeat)}
+
+    if options.output:
+        with open(options.output, 'w') as file:
+            json.dump(results, file, indent=2)
+            file.write('\n')
+
+    if options.baseline:
+        with open(options.baseline) as file:
+            regressions = compare(results, json.load(file), options.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,26 @@
 from django.contrib import admin
-from .models import Schedule
+from django.db import transaction
+from .cache import schedule_changed
+from .models import Schedule, ScheduleChange
 
 
-admin.site.register(Schedule)
+@admin.register(Schedule)
+class ScheduleAdmin(admin.ModelAdmin):
+    def save_model(self, request, obj, form, change):
+        previous = Schedule.objects.get(pk=obj.pk) if change else None
+        super().save_model(request, obj, form, change)
+        if previous:
+            schedule_changed(changes=[ScheduleChange.updated(obj, ScheduleChange.values(previous))])
+        else:
+            schedule_changed(changes=[ScheduleChange.created(obj)])
+
+    def delete_model(self, request, obj):
+        entry = ScheduleChange.deleted(obj)
+        super().delete_model(request, obj)
+        schedule_changed(changes=[entry])
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            entries = [ScheduleChange.deleted(record) for record in queryset]
+            super().delete_queryset(request, queryset)
+            schedule_changed(changes=entries)
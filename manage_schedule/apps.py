@@ -4,3 +4,19 @@ from django.apps import AppConfig
 class ManageScheduleConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'manage_schedule'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from .authentication import forget_user
+        from .events import publish_changes
+        from .metrics import install_query_recorder
+        from .occupancy import follow_schedule
+        from .signals import schedule_version_changed
+
+        schedule_version_changed.connect(follow_schedule)
+        schedule_version_changed.connect(publish_changes)
+        post_save.connect(forget_user, sender=get_user_model())
+        post_delete.connect(forget_user, sender=get_user_model())
+        connection_created.connect(install_query_recorder)
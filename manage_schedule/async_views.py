@@ -0,0 +1,298 @@
+from asgiref.sync import sync_to_async
+from inspect import isawaitable
+from itertools import islice
+from rest_framework import exceptions, status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from drf_yasg.utils import swagger_auto_schema
+from .cache import aget_schedule_version, aget_cached_payload, schedule_changed
+from .events import OVERFLOW, broadcaster, format_event, replay_events, reset_event
+from .models import Schedule, ScheduleChange
+from .occupancy import occupancy
+from .renderers import EventStreamRenderer, FastJSONRenderer
+from .serializers import (WeeklyScheduleSerializer, RecordSerializer, EditRecordTimelineSerializer,
+                          build_weekly_schedule, astream_weekly_schedule)
+from .utils import overlapping_records, overlap_message, is_overlap_violation
+from .views import JSONErrorsMixin
+
+
+async def aiterate(queryset, chunk_size=2000):
+    """
+    Iterate a queryset through a server-side cursor from async code. Used instead of QuerySet.aiterator(), which
+    starts values_list() queries in the event loop thread in Django 5.1.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    next_chunk = sync_to_async(lambda: list(islice(rows, chunk_size)))
+
+    while chunk := await next_chunk():
+        for row in chunk:
+            yield row
+
+
+@sync_to_async
+def write_changed(write, changes, added=None, removed=None):
+    """
+    Run `write` and log its changes in one transaction. Django has no async transactions, so this runs in a thread.
+    """
+    with transaction.atomic():
+        write()
+        schedule_changed(added=added, removed=removed, changes=changes())
+
+
+@sync_to_async
+def release_connection():
+    """
+    Close the request's database connection (back into the pool, when pooling) so a long-lived stream does not hold it
+    until the client disconnects. It is reopened if needed.
+    """
+    connection.close()
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView for coroutine handlers. Django treats the view as async when all its handlers are coroutines, so under
+    ASGI a request waiting on the database does not hold a worker thread. Authenticators providing `aauthenticate`
+    are awaited, others run in a thread.
+    """
+
+    async def authenticate(self, request):
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth_tuple = await authenticator.aauthenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.authenticate(request)
+            self.initial(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncGetWeekSchedule(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get the weekly schedule (async, same parameters as /weekly-schedule/)",
+        responses={200: WeeklyScheduleSerializer(many=True)},
+        tags=['Schedule']
+    )
+    async def get(self, request):
+        slots = Schedule.objects.weekly_slots()
+        cache_name = 'weekly'
+        member = request.query_params.get('member')
+
+        if member is not None:
+            try:
+                member = int(member)
+            except ValueError:
+                return Response('Member ID must be an integer!', status=status.HTTP_400_BAD_REQUEST)
+
+            slots = slots.filter(ids__contains=[member])
+            cache_name = f'weekly:member:{member}'
+
+        if request.query_params.get('stream', '').lower() in ('1', 'true'):
+            return StreamingHttpResponse(astream_weekly_schedule(aiterate(slots)),
+                                         content_type='application/json')
+
+        version = await aget_schedule_version()
+        etag = f'"{version}"'
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        async def build():
+            return build_weekly_schedule([slot async for slot in slots])
+
+        schedule = await aget_cached_payload(cache_name, version, build)
+        return Response(schedule, status=status.HTTP_200_OK, headers={'ETag': etag})
+
+
+class AsyncCreateRecord(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Create a record (async)",
+        request_body=RecordSerializer,
+        responses={
+            201: "New record was added successfully!",
+            400: "Validation errors or overlapping time interval"
+        }
+    )
+    async def post(self, request):
+        serializer = RecordSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        day = serializer.validated_data['day']
+        new_start = serializer.validated_data['start_time']
+        new_end = serializer.validated_data['end_time']
+
+        if not occupancy.is_free(day, new_start, new_end) and \
+                await overlapping_records(day, new_start, new_end).aexists():
+            return Response(overlap_message(new_start, new_end), status=status.HTTP_400_BAD_REQUEST)
+
+        record = Schedule(**serializer.validated_data)
+        try:
+            await write_changed(record.save, lambda: [ScheduleChange.created(record)], added=[record.slot])
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            return Response(overlap_message(new_start, new_end), status=status.HTTP_400_BAD_REQUEST)
+
+        return Response('New record was added successfully!', status=status.HTTP_201_CREATED)
+
+
+class AsyncDeleteRecord(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(operation_description="Delete a record by its ID (async, see /delete-record/)")
+    async def delete(self, request):
+        record_id = request.query_params.get('record_id')
+
+        if not record_id:
+            return Response('Record ID is required to delete! Enter in correct format!',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            record = await Schedule.objects.aget(id=record_id)
+        except Schedule.DoesNotExist:
+            return Response('This record already deleted or record with those timeline does not exist!',
+                            status=status.HTTP_404_NOT_FOUND)
+
+        entry = ScheduleChange.deleted(record)
+        await write_changed(record.delete, lambda: [entry], removed=[record.slot])
+
+        return Response('The record was deleted successfully!', status=status.HTTP_200_OK)
+
+
+class AsyncUpdateRecord(AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Update a record by its ID and new data (async, see /update-record/)",
+        request_body=EditRecordTimelineSerializer,
+        responses={200: EditRecordTimelineSerializer}
+    )
+    async def patch(self, request):
+        record_id = request.query_params.get('record_id')
+
+        try:
+            record = await Schedule.objects.aget(id=record_id)
+        except Schedule.DoesNotExist:
+            return Response('The record with this timeline does not exist!', status=status.HTTP_404_NOT_FOUND)
+
+        previous_slot = record.slot
+        previous_values = ScheduleChange.values(record)
+        serializer = EditRecordTimelineSerializer(record, data=request.data, partial=True)
+
+        # The validation checks the rest of the day in the database.
+        if not await sync_to_async(serializer.is_valid)():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        record.start_time = serializer.validated_data['start_time']
+        record.end_time = serializer.validated_data['end_time']
+
+        try:
+            await write_changed(lambda: record.save(update_fields=['start_time', 'end_time']),
+                                lambda: [ScheduleChange.updated(record, previous_values)],
+                                added=[record.slot], removed=[previous_slot])
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            return Response({api_settings.NON_FIELD_ERRORS_KEY: [overlap_message(record.start_time, record.end_time)]},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class AsyncScheduleEvents(JSONErrorsMixin, AsyncAPIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, EventStreamRenderer]
+
+    @swagger_auto_schema(
+        operation_description="Stream the schedule changes as server-sent events (create, update, delete, and reset "
+                              "when the client must download the weekly schedule again). Event IDs are change log "
+                              "sequence numbers, so a client reconnecting with Last-Event-ID misses nothing. Needs an "
+                              "ASGI server.",
+        responses={200: "text/event-stream"},
+        tags=['Schedule']
+    )
+    async def get(self, request):
+        try:
+            since = int(request.headers['Last-Event-ID'])
+        except (KeyError, ValueError):
+            since = None
+
+        response = StreamingHttpResponse(self.stream(since), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, since):
+        # Subscribe before reading the log, so no change falls between the replay and the live events.
+        subscription = broadcaster.subscribe()
+        try:
+            yield 'retry: 3000\n\n'
+
+            if since is not None:
+                events = await sync_to_async(replay_events)(since, settings.SCHEDULE_EVENTS_QUEUE_SIZE)
+                if events is None:
+                    yield format_event(reset_event())
+                    return
+                for event in events:
+                    yield format_event(event)
+                    since = event['seq']
+
+            await release_connection()
+            while True:
+                event = await subscription.get(timeout=settings.SCHEDULE_EVENTS_HEARTBEAT)
+
+                if event is None:
+                    yield ': keep-alive\n\n'
+                elif event is OVERFLOW:
+                    # The client fell too far behind; it resyncs and reconnects.
+                    yield format_event(reset_event())
+                    return
+                elif since is None or event['seq'] is None or event['seq'] > since:
+                    yield format_event(event)
+        finally:
+            broadcaster.unsubscribe(subscription)
@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+def user_cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def forget_user(sender, instance, **kwargs):
+    """
+    Drops a saved or deleted user from the CachedJWTAuthentication cache, so deactivation and password changes take
+    effect on the next request. Bulk updates bypass the signal and wait for SCHEDULE_AUTH_USER_CACHE_TIMEOUT.
+    """
+    cache.delete(user_cache_key(getattr(instance, api_settings.USER_ID_FIELD)))
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication which async views (see async_views.AsyncAPIView) can await, so the user query does not block
+    the event loop. Sync views use it exactly like JWTAuthentication. Queries the user on every request.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        return await self.aget_user(validated_token), validated_token
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+    def check_user(self, user, validated_token):
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+    async def aget_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        self.check_user(user, validated_token)
+        return user
+
+
+class StatelessJWTAuthentication(AsyncJWTAuthentication):
+    """
+    Builds the user (SIMPLE_JWT TOKEN_USER_CLASS) from the validated token claims, so authentication costs no query.
+    A deactivated user keeps access until the access token expires (ACCESS_TOKEN_LIFETIME).
+    """
+
+    def get_user(self, validated_token):
+        self.get_user_id(validated_token)
+        return api_settings.TOKEN_USER_CLASS(validated_token)
+
+    async def aget_user(self, validated_token):
+        return self.get_user(validated_token)
+
+
+class CachedJWTAuthentication(AsyncJWTAuthentication):
+    """
+    Queries the user at most once per SCHEDULE_AUTH_USER_CACHE_TIMEOUT seconds. Saving or deleting the user drops
+    the cached copy (see forget_user).
+    """
+
+    def get_user(self, validated_token):
+        key = user_cache_key(self.get_user_id(validated_token))
+        user = cache.get(key)
+
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, settings.SCHEDULE_AUTH_USER_CACHE_TIMEOUT)
+
+        self.check_user(user, validated_token)
+        return user
+
+    async def aget_user(self, validated_token):
+        key = user_cache_key(self.get_user_id(validated_token))
+        user = await cache.aget(key)
+
+        if user is None:
+            user = await super().aget_user(validated_token)
+            await cache.aset(key, user, settings.SCHEDULE_AUTH_USER_CACHE_TIMEOUT)
+
+        self.check_user(user, validated_token)
+        return user
@@ -0,0 +1,127 @@
+import time
+from django.core.cache import cache
+from django.db import connection, transaction
+from .models import Schedule, ScheduleChange
+from .routers import payload_keys, payload_storage
+from .signals import schedule_version_changed
+
+VERSION_KEY = 'schedule:version'
+
+# Key of the PostgreSQL advisory lock which orders the change log writers.
+CHANGE_LOG_LOCK = 7_301_004
+
+
+def get_schedule_version():
+    """
+    Return the current schedule version. A missing counter (first use, eviction or a cache restart) starts from the
+    current time in nanoseconds, so a new counter never reuses a version of a payload cached before.
+    """
+    version = cache.get(VERSION_KEY)
+
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+
+    return version
+
+
+async def aget_schedule_version():
+    version = await cache.aget(VERSION_KEY)
+
+    if version is None:
+        await cache.aadd(VERSION_KEY, time.time_ns(), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+
+    return version
+
+
+def bump_schedule_version():
+    try:
+        return cache.incr(VERSION_KEY)
+    except ValueError:
+        return get_schedule_version()
+
+
+def schedule_changed(added=None, removed=None, changes=None):
+    """
+    Invalidate every cached schedule payload once the current transaction commits. Must be called by every code path
+    which writes Schedule rows, inside the transaction of the write. `added` and `removed` list the written slots (see
+    Schedule.slot) for listeners which follow the schedule incrementally; leave both out when they are not known.
+
+    `changes` (unsaved ScheduleChange entries) are appended to the change log. Without them a reset entry is appended,
+    which sends the clients of the change feed back to the full schedule.
+    """
+    changes = changes or [ScheduleChange(op=ScheduleChange.RESET)]
+
+    def commit():
+        version = bump_schedule_version()
+        schedule_version_changed.send(sender=Schedule, version=version, added=added, removed=removed, changes=changes)
+
+    log_changes(changes)
+    transaction.on_commit(commit)
+
+
+def log_changes(changes):
+    """
+    Append entries to the change log. The transaction-level advisory lock makes concurrent writers take their
+    sequence numbers one after another and keep the lock until they commit, so a reader which has seen an entry can
+    not miss an earlier one committed later.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT pg_advisory_xact_lock(%s)', [CHANGE_LOG_LOCK])
+    ScheduleChange.objects.bulk_create(changes)
+
+
+def get_cached_payload(name, version, build):
+    """
+    Return the payload cached under `name` for the given schedule version, building and caching it on a miss.
+    """
+    keys = payload_keys(f'schedule:{name}:{version}')
+    cached = cache.get_many(keys)
+    payload = next((cached[key] for key in keys if key in cached), None)
+
+    if payload is None:
+        payload = build()
+        suffix, timeout = payload_storage()
+        cache.set(keys[0] + suffix, payload, timeout=timeout)
+
+    return payload
+
+
+async def aget_cached_payload(name, version, build):
+    """
+    Async counterpart of get_cached_payload, `build` is a coroutine function.
+    """
+    keys = payload_keys(f'schedule:{name}:{version}')
+    cached = await cache.aget_many(keys)
+    payload = next((cached[key] for key in keys if key in cached), None)
+
+    if payload is None:
+        payload = await build()
+        suffix, timeout = payload_storage()
+        await cache.aset(keys[0] + suffix, payload, timeout=timeout)
+
+    return payload
+
+
+def get_cached_payloads(prefix, names, version, build_missing):
+    """
+    Batch variant of get_cached_payload for the payloads `prefix:name`. `build_missing` receives the names missing
+    from the cache and returns a dict with their payloads, so all of them can be built at once.
+    """
+    keys = {name: payload_keys(f'schedule:{prefix}:{name}:{version}') for name in names}
+    cached = cache.get_many([key for name_keys in keys.values() for key in name_keys])
+    payloads = {}
+    for name, name_keys in keys.items():
+        key = next((key for key in name_keys if key in cached), None)
+        if key is not None:
+            payloads[name] = cached[key]
+    missing = [name for name in names if name not in payloads]
+
+    if missing:
+        built = build_missing(missing)
+        suffix, timeout = payload_storage()
+        cache.set_many({keys[name][0] + suffix: built[name] for name in missing}, timeout=timeout)
+        payloads.update(built)
+
+    return payloads
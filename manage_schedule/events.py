@@ -0,0 +1,210 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from django.conf import settings
+from django.db import connection
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+from .utils import last_change_seq, needs_resync, changes_after
+
+logger = logging.getLogger(__name__)
+
+# Put in a subscription queue instead of the events it could not hold.
+OVERFLOW = object()
+
+
+EVENT_FIELDS = ('seq', 'op', 'record_id', 'before', 'after')
+
+
+def change_event(change):
+    """The event of a ScheduleChange entry."""
+    return {field: getattr(change, field) for field in EVENT_FIELDS}
+
+
+def reset_event(seq=None):
+    return {'seq': seq, 'op': 'reset', 'record_id': None, 'before': None, 'after': None}
+
+
+def format_event(event):
+    """Encode an event as a server-sent event. The change sequence number, when known, is the event ID."""
+    event_id = f"id: {event['seq']}\n" if event['seq'] is not None else ''
+    return f"{event_id}event: {event['op']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+class Subscription:
+    """
+    Queue of the events of one connection. It holds at most `size` events: a client which does not keep up loses its
+    backlog and gets OVERFLOW instead, so a slow client never makes the process buffer without bound.
+    """
+
+    def __init__(self, size):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(size)
+        self.overflowed = False
+
+    def offer(self, events):
+        """Runs in the loop of the subscription."""
+        if self.overflowed:
+            return
+
+        for event in events:
+            try:
+                self.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflowed = True
+                while not self.queue.empty():
+                    self.queue.get_nowait()
+                self.queue.put_nowait(OVERFLOW)
+                return
+
+    async def get(self, timeout=None):
+        """Return the next event, OVERFLOW, or None when nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InMemoryBackend:
+    """
+    Delivers the events to the subscribers of this process only. Enough for a single process (and for tests).
+    """
+    deliver = None
+
+    def start(self, deliver):
+        self.deliver = deliver
+
+    def publish(self, events):
+        if self.deliver:
+            self.deliver(events)
+
+
+class PostgresBackend:
+    """
+    Carries the events through PostgreSQL NOTIFY, so every process serving the event stream gets the writes of every
+    other process. A daemon thread LISTENs on its own connection once the first client subscribes.
+    """
+    channel = 'schedule_events'
+    # NOTIFY payloads must stay below 8000 bytes.
+    max_payload = 7900
+    reconnect_delay = 1
+
+    def start(self, deliver):
+        self.deliver = deliver
+        threading.Thread(target=self.listen, name='schedule-events-listener', daemon=True).start()
+
+    def listen(self):
+        reconnecting = False
+        while True:
+            try:
+                # A connection of its own, never one of the pool: it stays open for the life of the process.
+                listener = connection.Database.connect(**connection.get_connection_params())
+                listener.autocommit = True
+                with listener.cursor() as cursor:
+                    cursor.execute(f'LISTEN {self.channel}')
+
+                if reconnecting:
+                    # Notifications sent while the listener was away are lost.
+                    self.deliver([reset_event()])
+                reconnecting = True
+
+                while True:
+                    for payload in wait_notifies(listener, 60):
+                        self.deliver(json.loads(payload))
+            except Exception:
+                logger.exception('Schedule event listener lost its connection')
+                time.sleep(self.reconnect_delay)
+
+    def publish(self, events):
+        payloads, batch = [], []
+        for event in events:
+            if len(json.dumps(event)) > self.max_payload:
+                # Too large to carry, the clients fetch the schedule again instead.
+                event = reset_event(event['seq'])
+            if batch and len(json.dumps(batch + [event])) > self.max_payload:
+                payloads.append(json.dumps(batch))
+                batch = []
+            batch.append(event)
+        if batch:
+            payloads.append(json.dumps(batch))
+
+        with connection.cursor() as cursor:
+            for payload in payloads:
+                cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+
+def wait_notifies(listener, timeout):
+    """Payloads of the notifications `listener` receives within `timeout` seconds, with psycopg 3 or psycopg2."""
+    if hasattr(listener, 'poll'):  # psycopg2
+        if select.select([listener], [], [], timeout) != ([], [], []):
+            listener.poll()
+            while listener.notifies:
+                yield listener.notifies.pop(0).payload
+    else:  # psycopg 3
+        for notify in listener.notifies(timeout=timeout):
+            yield notify.payload
+
+
+class Broadcaster:
+    """
+    Fans the events published by this process's writes (through the backend) out to the subscriptions of the open
+    event streams. Publishing is safe from any thread; subscriptions belong to an event loop.
+    """
+
+    def __init__(self, backend, queue_size):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+        self.started = False
+
+    def subscribe(self):
+        subscription = Subscription(self.queue_size)
+        with self.lock:
+            if not self.started:
+                self.backend.start(self.deliver)
+                self.started = True
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, events):
+        if events:
+            self.backend.publish(events)
+
+    def deliver(self, events):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+
+        for subscription in subscriptions:
+            subscription.loop.call_soon_threadsafe(subscription.offer, events)
+
+
+def replay_events(since, limit):
+    """
+    Return the events following the sequence number `since` from the change log, or None when the client has to
+    resync: the log can not tell what changed, or more than `limit` changes are missing.
+    """
+    if needs_resync(since, last_change_seq()):
+        return None
+
+    changes, has_more = changes_after(since, limit)
+    if has_more:
+        return None
+    return [{field: change[field] for field in EVENT_FIELDS} for change in changes]
+
+
+broadcaster = SimpleLazyObject(lambda: Broadcaster(import_string(settings.SCHEDULE_EVENTS_BACKEND)(),
+                                                   settings.SCHEDULE_EVENTS_QUEUE_SIZE))
+
+
+def publish_changes(sender, changes=None, **kwargs):
+    """Receiver of schedule_version_changed which publishes the logged changes of a committed write."""
+    if changes:
+        broadcaster.publish([change_event(change) for change in changes])
@@ -0,0 +1,100 @@
+import hashlib
+import json
+from datetime import timedelta
+from functools import wraps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from drf_yasg import openapi
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from .models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = 'Idempotency-Key'
+
+IDEMPOTENCY_KEY_PARAMETER = openapi.Parameter(
+    IDEMPOTENCY_HEADER,
+    openapi.IN_HEADER,
+    description="Unique key of the request: its retries with the same key get the first response back and change "
+                "nothing",
+    type=openapi.TYPE_STRING,
+    required=False
+)
+
+# Stores the response unless a live row holds the key, which a concurrent request with the same key may have inserted:
+# the statement then waits for that request to commit and returns no row.
+STORE_RESPONSE_SQL = (
+    'INSERT INTO {table} AS stored (user_id, endpoint, key, fingerprint, status, body, expires_at) '
+    'VALUES (%s, %s, %s, %s, %s, %s::jsonb, %s) '
+    'ON CONFLICT (user_id, endpoint, key) DO UPDATE SET fingerprint = EXCLUDED.fingerprint, status = EXCLUDED.status, '
+    'body = EXCLUDED.body, expires_at = EXCLUDED.expires_at WHERE stored.expires_at <= now() '
+    'RETURNING 1'
+)
+
+
+def request_fingerprint(request):
+    content = json.dumps([request.data, sorted(request.query_params.lists())], cls=JSONEncoder, sort_keys=True)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def replay(stored, fingerprint):
+    if stored.fingerprint != fingerprint:
+        return Response(f'This {IDEMPOTENCY_HEADER} was already used with a different request!',
+                        status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    return Response(stored.body, status=stored.status, headers={'Idempotent-Replayed': 'true'})
+
+
+def find_stored(request, endpoint, key):
+    return IdempotencyKey.objects.filter(user=request.user, endpoint=endpoint, key=key,
+                                         expires_at__gt=timezone.now()).first()
+
+
+def idempotent(handler):
+    """
+    Makes a (sync) write handler honor the Idempotency-Key header. The response to the first request with a key is
+    stored for SCHEDULE_IDEMPOTENCY_TTL seconds in the transaction of its writes, and its retries get it back without
+    running the handler again. Keys are scoped to the user and the endpoint; reusing one for a different request is
+    rejected. 5xx responses are not stored, so the request can be retried.
+
+    A retry sent while the first request still runs runs too, but waits for it to commit, rolls its own writes back and
+    returns the stored response.
+    """
+    endpoint = handler.__qualname__
+
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_HEADER)
+        if key is None:
+            return handler(view, request, *args, **kwargs)
+        if not key or len(key) > IdempotencyKey._meta.get_field('key').max_length:
+            return Response(f'{IDEMPOTENCY_HEADER} must be 1 to 255 characters long!',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = request_fingerprint(request)
+        stored = find_stored(request, endpoint, key)
+        if stored is not None:
+            return replay(stored, fingerprint)
+
+        with transaction.atomic():
+            response = handler(view, request, *args, **kwargs)
+            if response.status_code >= 500:
+                return response
+
+            expires_at = timezone.now() + timedelta(seconds=settings.SCHEDULE_IDEMPOTENCY_TTL)
+            with connection.cursor() as cursor:
+                cursor.execute(STORE_RESPONSE_SQL.format(table=IdempotencyKey._meta.db_table), [
+                    request.user.pk, endpoint, key, fingerprint, response.status_code,
+                    json.dumps(response.data, cls=JSONEncoder), expires_at,
+                ])
+                if cursor.fetchone() is not None:
+                    return response
+            transaction.set_rollback(True)
+
+        stored = find_stored(request, endpoint, key)
+        if stored is None:
+            return Response('A request with this Idempotency-Key has just expired! Repeat the request.',
+                            status=status.HTTP_409_CONFLICT)
+        return replay(stored, fingerprint)
+
+    return wrapper
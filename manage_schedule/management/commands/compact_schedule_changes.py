@@ -0,0 +1,34 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from manage_schedule.models import ScheduleChange
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete the change log entries older than the given number of days. The newest of them is kept as a reset "
+        "entry, so change feed clients which have not seen the deleted entries are told to resync."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=7, help="Keep the entries of this many days (default 7)")
+
+    def handle(self, *args, days=7, **options):
+        cutoff = timezone.now() - timedelta(days=days)
+
+        with transaction.atomic():
+            boundary = (ScheduleChange.objects.filter(created_at__lt=cutoff).order_by('-seq')
+                        .values_list('seq', flat=True).first())
+            if boundary is None:
+                self.stdout.write('Nothing to compact.')
+                return
+
+            deleted, _ = ScheduleChange.objects.filter(seq__lt=boundary).delete()
+            ScheduleChange.objects.filter(seq=boundary).update(op=ScheduleChange.RESET, record_id=None, before=None,
+                                                               after=None)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {deleted + 1} change log entries up to #{boundary} into a reset entry.'
+        ))
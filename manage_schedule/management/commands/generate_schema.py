@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from manage_schedule.openapi import code_fingerprint, generate_schemas, read_schemas, write_schemas
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the OpenAPI schema served at /swagger.json and /swagger.yaml into SCHEDULE_OPENAPI_DIR. Run it when "
+        "deploying, otherwise the first schema request of a process running new code generates it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate even if the code has not changed")
+
+    def handle(self, *args, force=False, **options):
+        fingerprint = code_fingerprint()
+
+        if not force and read_schemas(fingerprint) is not None:
+            self.stdout.write('The schema is up to date.')
+            return
+
+        write_schemas(fingerprint, generate_schemas())
+        self.stdout.write(self.style.SUCCESS(f'Generated the schema into {settings.SCHEDULE_OPENAPI_DIR}.'))
@@ -0,0 +1,250 @@
+import csv
+import io
+import json
+import time as timer
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, connection, transaction
+from manage_schedule.cache import schedule_changed
+from manage_schedule.models import Schedule
+from manage_schedule.utils import time_to_seconds, format_day_time, overlap_message, is_overlap_violation
+
+COPY_COLUMNS = ['day', 'day_index', 'start_time', 'end_time', 'ids']
+
+
+def read_rows(path, file_format):
+    """
+    Stream (line number, row) pairs from a CSV file with a header or a JSON Lines file. In CSV files `ids` holds a
+    JSON list or member IDs separated by semicolons.
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        if file_format == 'csv':
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(file, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError:
+                        yield line_number, line.rstrip('\n')
+
+
+def parse_ids(value):
+    if isinstance(value, str):
+        value = value.strip()
+        value = json.loads(value) if value.startswith('[') else [item for item in value.split(';') if item.strip()]
+    if not isinstance(value, list):
+        raise ValueError("ids must be a list of member IDs.")
+    try:
+        return [int(item) for item in value]
+    except (TypeError, ValueError):
+        raise ValueError("ids must be a list of member IDs.")
+
+
+def clean_row(row):
+    """
+    Validate a row like RecordSerializer does and return (day, start, end, ids) with times in seconds since midnight.
+    Raises ValueError with the reason of the rejection.
+    """
+    if not isinstance(row, dict):
+        raise ValueError("Not a JSON object.")
+
+    day = str(row.get('day') or '').strip().lower()
+    if day not in Schedule.DAY_INDEX:
+        raise ValueError(f'"{row.get("day")}" is not a valid choice.')
+
+    try:
+        start = time_to_seconds(time.fromisoformat(str(row.get('start_time') or '').strip()))
+        end = time_to_seconds(time.fromisoformat(str(row.get('end_time') or '').strip()))
+    except ValueError:
+        raise ValueError("Time has wrong format. Use one of these formats instead: hh:mm[:ss[.uuuuuu]].")
+
+    if start >= end:
+        raise ValueError("End time must be greater than start time.")
+
+    return day, start, end, parse_ids(row.get('ids', []))
+
+
+class CopyBuffer(io.TextIOBase):
+    """Read-only file over an iterator of strings, so COPY FROM STDIN streams the rows instead of buffering them."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.current = io.StringIO()
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size < 0:
+            return self.current.read() + ''.join(self.chunks)
+
+        data = self.current.read(size)
+        while not data:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return ''
+            self.current = io.StringIO(chunk)
+            data = self.current.read(size)
+        return data
+
+
+class Command(BaseCommand):
+    help = (
+        "Import schedule records from a CSV (with a header) or JSON Lines file with the fields day, start_time, "
+        "end_time and ids. Invalid rows and rows overlapping a stored record or an earlier row of the file are "
+        "written to an error file, the others are loaded in one transaction."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="A .csv or .jsonl file")
+        parser.add_argument('--format', choices=['csv', 'jsonl'],
+                            help="File format, guessed from the file extension by default")
+        parser.add_argument('--errors', help="File for the rejected rows (default: <path>.errors.jsonl)")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Rows per COPY chunk or bulk_create batch")
+        parser.add_argument('--dry-run', action='store_true', help="Validate and report without loading anything")
+
+    def handle(self, *args, path, format=None, errors=None, batch_size=5000, dry_run=False, **options):
+        path = Path(path)
+        if not path.is_file():
+            raise CommandError(f'File "{path}" does not exist.')
+
+        file_format = format or ('csv' if path.suffix.lower() == '.csv' else 'jsonl')
+        errors_path = Path(errors) if errors else path.with_name(f'{path.name}.errors.jsonl')
+        started = timer.perf_counter()
+
+        try:
+            with transaction.atomic():
+                rejected = self.find_rejected(path, file_format)
+                with open(errors_path, 'w', encoding='utf-8') if rejected else nullcontext() as error_file:
+                    accepted = self.accepted_rows(path, file_format, rejected, error_file)
+                    if dry_run:
+                        loaded = sum(1 for _ in accepted)
+                    else:
+                        loaded = self.load(accepted, batch_size)
+                        if loaded:
+                            schedule_changed()
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            raise CommandError("Records overlapping the file were created during the import. Run it again.")
+
+        elapsed = timer.perf_counter() - started
+        rate = (loaded + len(rejected)) / elapsed if elapsed else 0
+        action = 'Validated' if dry_run else 'Imported'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {loaded} records in {elapsed:.2f}s ({rate:.0f} rows/s), rejected {len(rejected)}.'
+        ))
+        if rejected:
+            self.stdout.write(f'Rejected rows were written to {errors_path}.')
+
+    def find_rejected(self, path, file_format):
+        """
+        First pass: validate every row and sweep every day in start order, keeping only the intervals (as compact
+        arrays) in memory. Returns {line number: reason} for the rows which can not be stored.
+        """
+        rejected = {}
+        starts, ends, lines = defaultdict(lambda: array('l')), defaultdict(lambda: array('l')), defaultdict(list)
+
+        for line_number, row in read_rows(path, file_format):
+            try:
+                day, start, end, _ = clean_row(row)
+            except ValueError as error:
+                rejected[line_number] = str(error)
+                continue
+            starts[day].append(start)
+            ends[day].append(end)
+            lines[day].append(line_number)
+
+        for day in starts:
+            stored_starts, stored_ends, stored_ids = [], [], []
+            stored = Schedule.objects.filter(day=day).order_by('start_time').values_list('start_time', 'end_time', 'id')
+            for start, end, record_id in stored:
+                stored_starts.append(time_to_seconds(start))
+                stored_ends.append(time_to_seconds(end))
+                stored_ids.append(record_id)
+
+            day_starts, day_ends, day_lines = starts[day], ends[day], lines[day]
+            accepted_end, accepted_line = None, None
+
+            order = sorted(range(len(day_starts)), key=lambda position: (day_starts[position], day_lines[position]))
+            for position in order:
+                start, end, line_number = day_starts[position], day_ends[position], day_lines[position]
+                message = overlap_message(format_day_time(start), format_day_time(end))
+
+                # Stored records never overlap each other, so the last one starting before `end` is the only candidate.
+                candidate = bisect_left(stored_starts, end) - 1
+                if candidate >= 0 and stored_ends[candidate] > start:
+                    rejected[line_number] = f'{message} (record {stored_ids[candidate]})'
+                elif accepted_end is not None and start < accepted_end:
+                    rejected[line_number] = f'{message} (line {accepted_line})'
+                else:
+                    accepted_end, accepted_line = end, line_number
+
+        return rejected
+
+    def accepted_rows(self, path, file_format, rejected, error_file):
+        """Second pass: yield the accepted rows and write the rejected ones with their reason to `error_file`."""
+        for line_number, row in read_rows(path, file_format):
+            if line_number in rejected:
+                error_file.write(json.dumps({'line': line_number, 'row': row, 'error': rejected[line_number]}) + '\n')
+            else:
+                yield clean_row(row)
+
+    def load(self, rows, batch_size):
+        if connection.vendor == 'postgresql':
+            return self.copy(rows, batch_size)
+
+        loaded = 0
+        batch = []
+        for day, start, end, ids in rows:
+            batch.append(Schedule(day=day, day_index=Schedule.DAY_INDEX[day], start_time=format_day_time(start),
+                                  end_time=format_day_time(end), ids=ids))
+            if len(batch) == batch_size:
+                Schedule.objects.bulk_create(batch)
+                loaded += len(batch)
+                batch = []
+
+        Schedule.objects.bulk_create(batch)
+        return loaded + len(batch)
+
+    def copy(self, rows, batch_size):
+        """Stream the rows to COPY FROM STDIN in chunks of `batch_size` CSV lines."""
+        loaded = 0
+
+        def chunks():
+            nonlocal loaded
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for day, start, end, ids in rows:
+                writer.writerow([day, Schedule.DAY_INDEX[day], format_day_time(start), format_day_time(end),
+                                 json.dumps(ids)])
+                loaded += 1
+                if loaded % batch_size == 0:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+
+        quote = connection.ops.quote_name
+        columns = ', '.join(quote(Schedule._meta.get_field(name).column) for name in COPY_COLUMNS)
+        sql = f'COPY {quote(Schedule._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)'
+
+        with connection.cursor() as cursor:
+            if hasattr(cursor.cursor, 'copy_expert'):  # psycopg2
+                cursor.cursor.copy_expert(sql, CopyBuffer(chunks()))
+            else:  # psycopg 3
+                with cursor.cursor.copy(sql) as copy:
+                    for chunk in chunks():
+                        copy.write(chunk)
+
+        return loaded
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from manage_schedule.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Delete the stored responses of idempotent requests whose Idempotency-Key has expired."
+
+    def handle(self, *args, **options):
+        deleted, _ = IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).delete()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys.'))
@@ -0,0 +1,279 @@
+import logging
+import threading
+import time as timer
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+slow_request_logger = logging.getLogger('manage_schedule.slow_requests')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# Statements kept per request for the slow request log.
+MAX_LOGGED_STATEMENTS = 100
+
+
+class Counter:
+    def __init__(self, name, documentation, labels):
+        self.name, self.documentation, self.labels = name, documentation, labels
+        self.values = {}
+
+    def inc(self, labels, value=1):
+        self.values[labels] = self.values.get(labels, 0) + value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in sorted(self.values.items()):
+            yield f'{self.name}{{{format_labels(self.labels, labels)}}} {value:g}'
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels, buckets):
+        self.name, self.documentation, self.labels, self.buckets = name, documentation, labels, buckets
+        self.values = {}
+
+    def observe(self, labels, value):
+        # [count per bucket..., count above the last bucket, sum]
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 2)
+
+        position = 0
+        while position < len(self.buckets) and value > self.buckets[position]:
+            position += 1
+        series[position] += 1
+        series[-1] += value
+
+    def render(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, series in sorted(self.values.items()):
+            label_text = format_labels(self.labels, labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{label_text},le="{bound}"}} {cumulative}'
+            yield f'{self.name}_sum{{{label_text}}} {series[-1]:g}'
+            yield f'{self.name}_count{{{label_text}}} {cumulative}'
+
+
+def format_labels(names, values):
+    return ','.join(f'{name}="{value}"' for name, value in zip(names, values))
+
+
+class Registry:
+    """Metrics of this process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.request_duration = Histogram('schedule_http_request_duration_seconds', "Request latency.",
+                                          ('endpoint', 'method', 'status'), LATENCY_BUCKETS)
+        self.response_size = Histogram('schedule_http_response_size_bytes', "Response body size (not streamed).",
+                                       ('endpoint', 'method'), SIZE_BUCKETS)
+        self.db_queries = Counter('schedule_http_db_queries_total', "Database queries.", ('endpoint', 'method'))
+        self.db_time = Counter('schedule_http_db_query_seconds_total', "Time spent in database queries.",
+                               ('endpoint', 'method'))
+        self.serializer_time = Counter('schedule_http_serializer_seconds_total',
+                                       "Time spent building response payloads.", ('endpoint', 'method'))
+
+    def record(self, endpoint, method, status, duration, stats, size):
+        labels = (endpoint, method)
+        with self.lock:
+            self.request_duration.observe((endpoint, method, str(status)), duration)
+            if size is not None:
+                self.response_size.observe(labels, size)
+            self.db_queries.inc(labels, stats.queries)
+            self.db_time.inc(labels, stats.query_time)
+            self.serializer_time.inc(labels, stats.serializer_time)
+
+    def render(self):
+        with self.lock:
+            metrics = (self.request_duration, self.response_size, self.db_queries, self.db_time, self.serializer_time)
+            lines = [line for metric in metrics for line in metric.render()]
+        lines.extend(render_pool_metrics(database_pools()))
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+# psycopg_pool statistics: gauges of the current state, then counters with the divisor turning them into base units.
+POOL_GAUGES = (
+    ('pool_max', 'schedule_db_pool_max_connections', "Largest number of connections the pool may open."),
+    ('pool_size', 'schedule_db_pool_connections', "Connections open, in use or available."),
+    ('pool_available', 'schedule_db_pool_available_connections', "Connections idle in the pool."),
+    ('requests_waiting', 'schedule_db_pool_requests_waiting', "Requests waiting for a connection."),
+)
+POOL_COUNTERS = (
+    ('requests_num', 1, 'schedule_db_pool_requests_total', "Connections requested."),
+    ('requests_queued', 1, 'schedule_db_pool_requests_queued_total', "Requests which had to wait for a connection."),
+    ('requests_wait_ms', 1000, 'schedule_db_pool_wait_seconds_total', "Time spent waiting for a connection."),
+    ('requests_errors', 1, 'schedule_db_pool_request_errors_total', "Requests which timed out waiting."),
+    ('usage_ms', 1000, 'schedule_db_pool_usage_seconds_total', "Time connections were in use."),
+    ('connections_num', 1, 'schedule_db_pool_connects_total', "Connections opened to the database."),
+    ('connections_ms', 1000, 'schedule_db_pool_connect_seconds_total', "Time spent opening connections."),
+    ('connections_errors', 1, 'schedule_db_pool_connect_errors_total', "Failed connection attempts."),
+    ('connections_lost', 1, 'schedule_db_pool_connections_lost_total', "Connections found broken by a check."),
+    ('returns_bad', 1, 'schedule_db_pool_returns_bad_total', "Connections returned in a bad state."),
+)
+
+
+def database_pools():
+    """The connection pools of the databases configured with OPTIONS['pool'] (psycopg 3)."""
+    return {alias: connections[alias].pool for alias in connections
+            if connections.settings[alias].get('OPTIONS', {}).get('pool')}
+
+
+def render_pool_metrics(pools):
+    if not pools:
+        return
+    stats = {alias: pool.get_stats() for alias, pool in sorted(pools.items())}
+
+    for key, name, documentation in POOL_GAUGES:
+        yield f'# HELP {name} {documentation}'
+        yield f'# TYPE {name} gauge'
+        for alias, values in stats.items():
+            yield f'{name}{{database="{alias}"}} {values.get(key, 0)}'
+
+    for key, divisor, name, documentation in POOL_COUNTERS:
+        yield f'# HELP {name} {documentation}'
+        yield f'# TYPE {name} counter'
+        for alias, values in stats.items():
+            yield f'{name}{{database="{alias}"}} {values.get(key, 0) / divisor:g}'
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_time', 'serializer_time', 'serializing', 'statements')
+
+    def __init__(self, keep_statements):
+        self.queries = 0
+        self.query_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.statements = [] if keep_statements else None
+
+
+# Stats of the request being served. Context variables follow the request into sync_to_async threads.
+current_request = ContextVar('schedule_request_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper (see install_query_recorder) adding every query to the stats of the request."""
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    started = timer.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = timer.perf_counter() - started
+        stats.queries += 1
+        stats.query_time += elapsed
+        if stats.statements is not None and len(stats.statements) < MAX_LOGGED_STATEMENTS:
+            stats.statements.append((elapsed, sql))
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created receiver: the wrapper list outlives reconnections of the same connection object."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def serializer_timer():
+    """Add the time of the block to the serializer time of the request. Nested blocks count once."""
+    stats = current_request.get()
+    if stats is None or stats.serializing:
+        yield
+        return
+
+    stats.serializing = True
+    started = timer.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serializer_time += timer.perf_counter() - started
+        stats.serializing = False
+
+
+def timed_serialization(function):
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with serializer_timer():
+            return function(*args, **kwargs)
+    return wrapper
+
+
+class RequestMetricsMiddleware:
+    """
+    Records latency, query count and time, serializer time and response size per endpoint (URL name) for /metrics.
+    With SCHEDULE_SLOW_REQUEST_SECONDS set, requests slower than that are logged with their SQL. Streamed responses
+    are measured up to their first byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SCHEDULE_METRICS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_request_seconds = settings.SCHEDULE_SLOW_REQUEST_SECONDS
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        stats = RequestStats(self.slow_request_seconds is not None)
+        token = current_request.set(stats)
+        started = timer.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+        self.finish(request, response, stats, timer.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats(self.slow_request_seconds is not None)
+        token = current_request.set(stats)
+        started = timer.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_request.reset(token)
+
+        self.finish(request, response, stats, timer.perf_counter() - started)
+        return response
+
+    def finish(self, request, response, stats, duration):
+        match = request.resolver_match
+        endpoint = match.url_name or match.view_name if match else 'unmatched'
+        size = None if response.streaming else len(response.content)
+        registry.record(endpoint, request.method, response.status_code, duration, stats, size)
+
+        if self.slow_request_seconds is not None and duration > self.slow_request_seconds:
+            statements = '\n'.join(f'  {elapsed * 1000:.2f}ms {sql}' for elapsed, sql in stats.statements)
+            slow_request_logger.warning(
+                'Slow request %s %s: %.3fs, %d queries (%.3fs), serializer %.3fs\n%s', request.method,
+                request.get_full_path(), duration, stats.queries, stats.query_time, stats.serializer_time, statements
+            )
+
+
+def metrics(request):
+    """Prometheus scrape endpoint. Send `Authorization: Bearer <SCHEDULE_METRICS_TOKEN>` when the token is set."""
+    if not settings.SCHEDULE_METRICS:
+        raise Http404
+    token = settings.SCHEDULE_METRICS_TOKEN
+    if token and request.headers.get('Authorization') != f'Bearer {token}':
+        return HttpResponse('Invalid metrics token!', status=401, content_type='text/plain')
+
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_schedule', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['day', 'start_time', 'end_time'], name='schedule_day_time_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+import django.contrib.postgres.constraints
+import manage_schedule.models
+from django.db import migrations, models
+
+
+CREATE_WEEK_RANGE = """
+CREATE FUNCTION schedule_week_range(day varchar, start_time time, end_time time) RETURNS tsrange AS $$
+    SELECT tsrange(week_day + start_time, week_day + end_time, '[)')
+    FROM (
+        SELECT DATE '2001-01-01' + CASE day
+            WHEN 'monday' THEN 0
+            WHEN 'tuesday' THEN 1
+            WHEN 'wednesday' THEN 2
+            WHEN 'thursday' THEN 3
+            WHEN 'friday' THEN 4
+            WHEN 'saturday' THEN 5
+            WHEN 'sunday' THEN 6
+        END AS week_day
+    ) AS reference_week;
+$$ LANGUAGE sql IMMUTABLE STRICT;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_schedule', '0002_schedule_day_time_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=CREATE_WEEK_RANGE,
+            reverse_sql='DROP FUNCTION schedule_week_range(varchar, time, time);',
+        ),
+        migrations.AddConstraint(
+            model_name='schedule',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(deferrable=models.Deferrable['IMMEDIATE'], expressions=[(manage_schedule.models.WeekRange('day', 'start_time', 'end_time'), '&&')], name='schedule_no_overlap'),
+        ),
+    ]
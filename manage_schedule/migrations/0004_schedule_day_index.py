@@ -0,0 +1,30 @@
+# Generated by Django 5.1.15 on 2026-10-18 12:58
+
+from django.db import migrations, models
+
+
+def fill_day_index(apps, schema_editor):
+    Schedule = apps.get_model('manage_schedule', 'Schedule')
+    days = [day for day, _ in Schedule._meta.get_field('day').choices]
+    day_index = models.Case(*[models.When(day=day, then=index) for index, day in enumerate(days)])
+    Schedule.objects.update(day_index=day_index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_schedule', '0003_schedule_no_overlap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='schedule',
+            name='day_index',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_day_index, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='schedule',
+            index=models.Index(fields=['day_index', 'start_time'], name='schedule_day_index_start_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 13:02
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_schedule', '0004_schedule_day_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='schedule',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['ids'], name='schedule_ids_gin_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.1.15 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_schedule', '0005_schedule_ids_gin_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleChange',
+            fields=[
+                ('seq', models.BigAutoField(primary_key=True, serialize=False)),
+                ('op', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('delete', 'Delete'), ('reset', 'Reset')], max_length=6)),
+                ('record_id', models.BigIntegerField(null=True)),
+                ('before', models.JSONField(null=True)),
+                ('after', models.JSONField(null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('op', 'reset')), fields=['seq'], name='schedule_change_reset_idx')],
+            },
+        ),
+    ]
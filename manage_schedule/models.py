@@ -1,6 +1,27 @@
+from django.conf import settings
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import DateTimeRangeField, RangeOperators
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 
+class WeekRange(models.Func):
+    """
+    Half-open [start, end) timestamp range of a slot placed on its weekday of a reference week. The SQL function is
+    created by migration 0003 and lets a plain GiST index compare the day and the time interval at once.
+    """
+    function = 'schedule_week_range'
+    output_field = DateTimeRangeField()
+
+
+class ScheduleQuerySet(models.QuerySet):
+    def weekly_slots(self):
+        """
+        Return (record_id, day, start_time, end_time, ids) rows ordered by weekday and start time in the database.
+        """
+        return self.order_by('day_index', 'start_time').values_list('id', 'day', 'start_time', 'end_time', 'ids')
+
+
 class Schedule(models.Model):
     DAY_CHOICES = [
         ('monday', 'Monday'),
@@ -12,7 +33,120 @@ class Schedule(models.Model):
         ('sunday', 'Sunday'),
     ]
 
+    DAY_INDEX = {
+        'monday': 0,
+        'tuesday': 1,
+        'wednesday': 2,
+        'thursday': 3,
+        'friday': 4,
+        'saturday': 5,
+        'sunday': 6
+    }
+
     day = models.CharField(max_length=10, choices=DAY_CHOICES)
     start_time = models.TimeField()
     end_time = models.TimeField()
     ids = models.JSONField()
+    day_index = models.PositiveSmallIntegerField(default=0, editable=False)
+
+    objects = ScheduleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['day', 'start_time', 'end_time'], name='schedule_day_time_idx'),
+            models.Index(fields=['day_index', 'start_time'], name='schedule_day_index_start_idx'),
+            GinIndex(fields=['ids'], opclasses=['jsonb_path_ops'], name='schedule_ids_gin_idx'),
+        ]
+        constraints = [
+            ExclusionConstraint(
+                name='schedule_no_overlap',
+                expressions=[(WeekRange('day', 'start_time', 'end_time'), RangeOperators.OVERLAPS)],
+                deferrable=models.Deferrable.IMMEDIATE,
+            ),
+        ]
+
+    @property
+    def slot(self):
+        return self.day, self.start_time, self.end_time, self.ids
+
+    def save(self, *args, **kwargs):
+        self.day_index = self.DAY_INDEX[self.day]
+        super().save(*args, **kwargs)
+
+
+
+class IdempotencyKey(models.Model):
+    """
+    Response of a write made with an Idempotency-Key header, replayed to the retries of the request until it expires
+    (see idempotency.idempotent). Expired rows are ignored, overwritten by a new request with the same key and deleted
+    by the purge_idempotency_keys command.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    endpoint = models.CharField(max_length=50)
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status = models.PositiveSmallIntegerField()
+    body = models.JSONField(null=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'endpoint', 'key'], name='idempotency_key_unique'),
+        ]
+
+
+
+class ScheduleChange(models.Model):
+    """
+    Append-only log of schedule writes, read by the change feed (/weekly-schedule/changes/). Entries are appended in
+    the transaction of the write (see cache.schedule_changed) and `seq` grows in commit order.
+
+    A reset entry stands for writes which were not itemized (imports, compaction of the older entries): clients which
+    have not seen it must download the whole schedule again.
+    """
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    RESET = 'reset'
+
+    OP_CHOICES = [
+        (CREATE, 'Create'),
+        (UPDATE, 'Update'),
+        (DELETE, 'Delete'),
+        (RESET, 'Reset'),
+    ]
+
+    seq = models.BigAutoField(primary_key=True)
+    op = models.CharField(max_length=6, choices=OP_CHOICES)
+    record_id = models.BigIntegerField(null=True)
+    before = models.JSONField(null=True)
+    after = models.JSONField(null=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['seq'], condition=models.Q(op='reset'), name='schedule_change_reset_idx'),
+        ]
+
+    @staticmethod
+    def values(record):
+        return {
+            'day': record.day,
+            'start_time': record.start_time.isoformat(),
+            'end_time': record.end_time.isoformat(),
+            'ids': record.ids,
+        }
+
+    @classmethod
+    def created(cls, record):
+        return cls(op=cls.CREATE, record_id=record.id, after=cls.values(record))
+
+    @classmethod
+    def updated(cls, record, before):
+        """`before` holds the `values` of the record taken before it was changed."""
+        return cls(op=cls.UPDATE, record_id=record.id, before=before, after=cls.values(record))
+
+    @classmethod
+    def deleted(cls, record):
+        """Must be built before the record is deleted, Django clears its ID."""
+        return cls(op=cls.DELETE, record_id=record.id, before=cls.values(record))
@@ -0,0 +1,139 @@
+import threading
+from .cache import get_schedule_version
+from .models import Schedule
+
+try:
+    import numpy
+except ImportError:  # per-member counts and the vectorized heatmap are optional
+    numpy = None
+
+DAY_MINUTES = 24 * 60
+
+
+def minute_range(start, end):
+    """
+    Return the minutes touched by the interval (start, end): a partly covered last minute counts as occupied.
+    """
+    first = start.hour * 60 + start.minute
+    last = end.hour * 60 + end.minute + (1 if end.second or end.microsecond else 0)
+    return first, last
+
+
+def minute_mask(first, last):
+    return ((1 << (last - first)) - 1) << first
+
+
+class OccupancyMap:
+    """
+    In-memory occupancy of the week: one bitset of 1440 minutes per weekday, plus (with NumPy) the number of busy
+    members per minute. The map follows the writes of this process incrementally and is rebuilt from the database
+    whenever it misses a schedule version, e.g. after a write made by another process.
+
+    Minutes only partly covered by a slot stay marked after the slot is removed, so the map can report a minute as
+    busy when it is free but never the other way round.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.days = [0] * len(Schedule.DAY_INDEX)
+        self.members = numpy.zeros((len(Schedule.DAY_INDEX), DAY_MINUTES), dtype=numpy.int32) if numpy else None
+
+    def _add(self, day, start, end, ids, sign=1):
+        day_index = Schedule.DAY_INDEX[day]
+        first, last = minute_range(start, end)
+
+        if sign > 0:
+            self.days[day_index] |= minute_mask(first, last)
+        else:
+            # Clear only the minutes the slot covers completely, a neighbour may share the boundary minutes.
+            inner_first = first + (1 if start.second or start.microsecond else 0)
+            inner_last = end.hour * 60 + end.minute
+            if inner_last > inner_first:
+                self.days[day_index] &= ~minute_mask(inner_first, inner_last)
+
+        if self.members is not None and isinstance(ids, list):
+            self.members[day_index, first:last] += sign * len(ids)
+
+    def rebuild(self):
+        with self.lock:
+            version = get_schedule_version()
+            self.days = [0] * len(Schedule.DAY_INDEX)
+            if self.members is not None:
+                self.members.fill(0)
+
+            for slot in Schedule.objects.values_list('day', 'start_time', 'end_time', 'ids').iterator():
+                self._add(*slot)
+
+            # A write committed while the rows were read may or may not be part of them, so the map stays stale.
+            self.version = version if version == get_schedule_version() else None
+
+    def apply(self, version, added=None, removed=None):
+        """
+        Apply the slots written by the version `version`. Changes which do not directly follow the version of the map,
+        or whose slots are unknown, leave the map stale until the next rebuild.
+        """
+        with self.lock:
+            if (added is None and removed is None) or self.version is None or version != self.version + 1:
+                self.version = None
+                return
+
+            for slot in removed or ():
+                self._add(*slot, sign=-1)
+            for slot in added or ():
+                self._add(*slot)
+            self.version = version
+
+    def synced(self):
+        """Return the map, rebuilt from the database first if it is behind the current schedule version."""
+        if self.version != get_schedule_version():
+            self.rebuild()
+        return self
+
+    def is_free(self, day, start, end):
+        """
+        Return True when the interval (start, end) certainly overlaps no slot: the map is up to date and no minute of
+        the interval is marked busy. False means the database has to be asked.
+        """
+        if self.version is None or self.version != get_schedule_version():
+            return False
+
+        return not self.days[Schedule.DAY_INDEX[day]] & minute_mask(*minute_range(start, end))
+
+    def heatmap(self, bucket=15):
+        """
+        Return, for every day, the share of busy minutes in each bucket of `bucket` minutes and, with NumPy, the average
+        number of busy members per minute of the bucket.
+        """
+        with self.lock:
+            days = list(self.days)
+            members = self.members.copy() if self.members is not None else None
+
+        result = {'bucket': bucket, 'density': {}}
+
+        if numpy is None:
+            full = (1 << bucket) - 1
+            for day, day_index in Schedule.DAY_INDEX.items():
+                bits = days[day_index]
+                result['density'][day] = [round(((bits >> offset) & full).bit_count() / bucket, 3)
+                                          for offset in range(0, DAY_MINUTES, bucket)]
+            return result
+
+        raw = b''.join(bits.to_bytes(DAY_MINUTES // 8, 'little') for bits in days)
+        busy = numpy.unpackbits(numpy.frombuffer(raw, dtype=numpy.uint8), bitorder='little')
+        density = busy.reshape(len(days), -1, bucket).mean(axis=2).round(3)
+        average_members = members.reshape(len(days), -1, bucket).mean(axis=2).round(3)
+
+        result['members'] = {}
+        for day, day_index in Schedule.DAY_INDEX.items():
+            result['density'][day] = density[day_index].tolist()
+            result['members'][day] = average_members[day_index].tolist()
+
+        return result
+
+
+occupancy = OccupancyMap()
+
+
+def follow_schedule(sender, version, added, removed, **kwargs):
+    occupancy.apply(version, added, removed)
@@ -0,0 +1,133 @@
+import gzip
+import hashlib
+import os
+from functools import lru_cache
+from importlib import import_module
+from importlib.metadata import version
+from pathlib import Path
+from django.apps import apps
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_safe
+from django.middleware.gzip import re_accepts_gzip
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+API_INFO = openapi.Info(
+    title="Your API Title",
+    default_version='v1',
+    description="API description",
+    terms_of_service="https://www.google.com/policies/terms/",
+    contact=openapi.Contact(email="contact@yourapi.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+SCHEMA_FORMATS = {
+    '.json': (OpenAPICodecJson, 'application/json'),
+    '.yaml': (OpenAPICodecYaml, 'application/yaml'),
+}
+# Installed packages the generated schema depends on, besides the project sources.
+SCHEMA_PACKAGES = ('djangorestframework', 'drf-yasg', 'Django')
+
+
+def code_fingerprint():
+    """Hash of the project sources and of the packages generating the schema: it changes with every deployment."""
+    digest = hashlib.sha256()
+    for package in SCHEMA_PACKAGES:
+        digest.update(f'{package}=={version(package)}\n'.encode())
+
+    roots = {Path(apps.get_app_config('manage_schedule').path),
+             Path(import_module(settings.ROOT_URLCONF).__file__).parent}
+    for root in sorted(roots):
+        for path in sorted(root.rglob('*.py')):
+            digest.update(str(path.relative_to(root.parent)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def generate_schemas():
+    """Encode the whole (public) schema in every format. No request: clients resolve paths against the schema URL."""
+    swagger = OpenAPISchemaGenerator(API_INFO).get_schema(request=None, public=True)
+    return {extension: codec(validators=[]).encode(swagger) for extension, (codec, _) in SCHEMA_FORMATS.items()}
+
+
+def schema_path(extension):
+    return Path(settings.SCHEDULE_OPENAPI_DIR) / f'openapi{extension}'
+
+
+def write_schemas(fingerprint, schemas):
+    """Write the schemas and then, atomically, the fingerprint which makes them current."""
+    directory = Path(settings.SCHEDULE_OPENAPI_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    for extension, content in schemas.items():
+        schema_path(extension).write_bytes(content)
+
+    temporary = directory / 'fingerprint.tmp'
+    temporary.write_text(fingerprint)
+    os.replace(temporary, directory / 'fingerprint')
+
+
+def read_schemas(fingerprint):
+    """The schemas written for this fingerprint, or None."""
+    directory = Path(settings.SCHEDULE_OPENAPI_DIR)
+    try:
+        if (directory / 'fingerprint').read_text() != fingerprint:
+            return None
+        return {extension: schema_path(extension).read_bytes() for extension in SCHEMA_FORMATS}
+    except OSError:
+        return None
+
+
+class SchemaDocument:
+    """A schema encoding with its gzip variant and their strong ETags."""
+
+    def __init__(self, content, content_type):
+        self.content = content
+        self.content_type = content_type
+        self.gzipped = gzip.compress(content, mtime=0)
+        digest = hashlib.sha256(content).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        self.gzip_etag = f'"{digest}-gzip"'
+
+
+@lru_cache(maxsize=None)
+def get_schema_documents():
+    """
+    Load the schemas once per process from SCHEDULE_OPENAPI_DIR, generating (and writing) them first when they are
+    missing or were generated from other code. `manage.py generate_schema` does the same ahead of time.
+    """
+    fingerprint = code_fingerprint()
+    schemas = read_schemas(fingerprint)
+
+    if schemas is None:
+        schemas = generate_schemas()
+        try:
+            write_schemas(fingerprint, schemas)
+        except OSError:  # a read-only deployment serves the schema from memory only
+            pass
+
+    return {extension: SchemaDocument(content, SCHEMA_FORMATS[extension][1])
+            for extension, content in schemas.items()}
+
+
+@require_safe
+def precomputed_schema(request, format):
+    """/swagger.json and /swagger.yaml: the precomputed schema, gzip compressed for clients which accept it."""
+    document = get_schema_documents()[format]
+    compress = bool(re_accepts_gzip.search(request.headers.get('Accept-Encoding', '')))
+    etag = document.gzip_etag if compress else document.etag
+
+    if etag in parse_etags(request.headers.get('If-None-Match', '')):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(document.gzipped if compress else document.content, content_type=document.content_type)
+        if compress:
+            response['Content-Encoding'] = 'gzip'
+
+    response['ETag'] = etag
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
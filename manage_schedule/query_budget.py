@@ -0,0 +1,68 @@
+import logging
+from functools import wraps
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Transaction control of nested atomic blocks, not counted: a test wraps every request in a transaction, so the same
+# view runs these statements under pytest only.
+TRANSACTION_CONTROL = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO SAVEPOINT')
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+class QueryBudget:
+    """
+    Most queries a block or a (sync) view method may run, checked according to SCHEDULE_QUERY_BUDGET_ACTION:
+    'raise' raises QueryBudgetExceeded, 'log' logs a warning, None skips the check and its bookkeeping.
+
+        @query_budget(2)
+        def get(self, request): ...
+
+        with query_budget(1, 'occupancy reload'): ...
+
+    Budgets are the same whatever the size of the schedule, so an N+1 query pattern exceeds them on a large one.
+    """
+
+    def __init__(self, limit, name=None):
+        self.limit = limit
+        self.name = name
+        self.action = None
+        self.queries = []
+
+    def __call__(self, function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with QueryBudget(self.limit, self.name or function.__qualname__):
+                return function(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self.action = settings.SCHEDULE_QUERY_BUDGET_ACTION
+        if self.action is not None:
+            connection.execute_wrappers.append(self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.action is None:
+            return
+        connection.execute_wrappers.remove(self.record)
+
+        if exc_type is None and len(self.queries) > self.limit:
+            message = '%s ran %d queries, its budget is %d:\n%s' % (
+                self.name, len(self.queries), self.limit, '\n'.join(f'  {sql}' for sql in self.queries))
+            if self.action == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+
+    def record(self, execute, sql, params, many, context):
+        if not sql.startswith(TRANSACTION_CONTROL):
+            self.queries.append(sql)
+        return execute(sql, params, many, context)
+
+
+def query_budget(limit, name=None):
+    return QueryBudget(limit, name)
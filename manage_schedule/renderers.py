@@ -0,0 +1,185 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta, timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+from .models import Schedule
+
+try:
+    import orjson
+except ImportError:  # FastJSONRenderer falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # application/msgpack is offered only when msgpack is installed (see settings.py)
+    msgpack = None
+
+# Weekly events of the iCalendar export recur from the week of this Monday.
+ICS_FIRST_MONDAY = date(2024, 1, 1)
+ICS_WEEKDAYS = ['MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU']
+
+
+# Values JSON and MessagePack have no type for (times, dates, decimals, ...) are converted like DRF's JSON encoder does.
+encode_value = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer writing the same bytes with orjson. Indented output (the browsable API, `; indent=` in the Accept
+    header), non-default JSON settings and data orjson rejects (e.g. non-string keys) go through the stdlib encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            # Datetimes pass through to encode_value: orjson formats UTC and times with microseconds differently.
+            content = orjson.dumps(data, default=encode_value, option=orjson.OPT_PASSTHROUGH_DATETIME)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Line and paragraph separators are escaped as by JSONRenderer, keeping the output a JavaScript subset.
+        if b'\xe2\x80' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return content
+
+
+class MessagePackRenderer(BaseRenderer):
+    """The JSON documents of the API in MessagePack, for internal services."""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_value)
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF negotiate `text/event-stream` (sent by EventSource) for the live events, which are streamed by the view.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+
+class ExportRenderer(BaseRenderer):
+    """
+    Renderer of the schedule export. DRF only uses it to negotiate the format (`?format=` or the Accept header), the
+    export itself is streamed by `stream`, which turns ordered (record_id, day, start_time, end_time, ids) slots into
+    chunks of text.
+    """
+    charset = 'utf-8'
+
+    def head(self):
+        return ''
+
+    def row(self, record_id, day, start_time, end_time, ids):
+        raise NotImplementedError
+
+    def tail(self):
+        return ''
+
+    def stream(self, slots, chunk_size=1000):
+        chunk = [self.head()]
+
+        for slot in slots:
+            chunk.append(self.row(*slot))
+
+            if len(chunk) >= chunk_size:
+                yield ''.join(chunk)
+                chunk = []
+
+        chunk.append(self.tail())
+        yield ''.join(chunk)
+
+
+class CSVRenderer(ExportRenderer):
+    """One record per line, readable by the import_schedule command."""
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def __init__(self):
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def line(self, values):
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        self.writer.writerow(values)
+        return self.buffer.getvalue()
+
+    def head(self):
+        return self.line(['record_id', 'day', 'start_time', 'end_time', 'ids'])
+
+    def row(self, record_id, day, start_time, end_time, ids):
+        return self.line([record_id, day, start_time.isoformat(), end_time.isoformat(), json.dumps(ids)])
+
+
+class NDJSONRenderer(ExportRenderer):
+    """One JSON object per line, readable by the import_schedule command."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def row(self, record_id, day, start_time, end_time, ids):
+        return json.dumps({'record_id': record_id, 'day': day, 'start_time': start_time.isoformat(),
+                           'end_time': end_time.isoformat(), 'ids': ids}, ensure_ascii=False) + '\n'
+
+
+def ics_escape(text):
+    return text.replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,').replace('\n', '\\n')
+
+
+def ics_fold(line):
+    """Fold a content line into lines of at most 75 octets, as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + '\r\n'
+
+    parts = []
+    while encoded:
+        size = 75 if not parts else 74
+        while size < len(encoded) and (encoded[size] & 0xC0) == 0x80:  # do not split a UTF-8 sequence
+            size -= 1
+        parts.append(encoded[:size].decode())
+        encoded = encoded[size:]
+    return '\r\n '.join(parts) + '\r\n'
+
+
+class ICalendarRenderer(ExportRenderer):
+    """Every record as an event repeating weekly (RRULE) on its day, in floating local time."""
+    media_type = 'text/calendar'
+    format = 'ics'
+
+    def __init__(self):
+        self.stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+    def head(self):
+        return ('BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//managing-weekly-schedule//Schedule export//EN\r\n'
+                'CALSCALE:GREGORIAN\r\n')
+
+    def row(self, record_id, day, start_time, end_time, ids):
+        day_index = Schedule.DAY_INDEX[day]
+        first_day = ICS_FIRST_MONDAY + timedelta(days=day_index)
+        members = ', '.join(str(member) for member in ids) if isinstance(ids, list) else json.dumps(ids)
+
+        return ''.join([
+            'BEGIN:VEVENT\r\n',
+            f'UID:schedule-record-{record_id}\r\n',
+            f'DTSTAMP:{self.stamp}\r\n',
+            f'DTSTART:{datetime.combine(first_day, start_time):%Y%m%dT%H%M%S}\r\n',
+            f'DTEND:{datetime.combine(first_day, end_time):%Y%m%dT%H%M%S}\r\n',
+            f'RRULE:FREQ=WEEKLY;BYDAY={ICS_WEEKDAYS[day_index]}\r\n',
+            ics_fold(f'SUMMARY:{ics_escape(f"Members: {members}")}'),
+            'END:VEVENT\r\n',
+        ])
+
+    def tail(self):
+        return 'END:VCALENDAR\r\n'
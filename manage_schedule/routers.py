@@ -0,0 +1,190 @@
+import itertools
+import logging
+import threading
+import time as timer
+from contextvars import ContextVar
+from functools import wraps
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+# Replication lag of a replica in seconds, 0 when it has replayed all it received and NULL on a primary.
+REPLICA_LAG_SQL = (
+    'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+    'ELSE extract(epoch FROM now() - pg_last_xact_replay_timestamp()) END'
+)
+
+
+class RoutingState:
+    """Database routing of one request (see ReplicaRoutingMiddleware)."""
+    __slots__ = ('use_replicas', 'replica_used', 'wrote')
+
+    def __init__(self):
+        self.use_replicas = False
+        self.replica_used = False
+        self.wrote = False
+
+
+routing_state = ContextVar('schedule_routing_state', default=None)
+
+REPLICA_PAYLOAD_SUFFIX = ':replica'
+
+
+class ReplicaSet:
+    """
+    Round-robin choice among the SCHEDULE_READ_REPLICAS of this process. A replica is checked at most every
+    SCHEDULE_REPLICA_CHECK_INTERVAL seconds and skipped while it is unreachable or lags more than
+    SCHEDULE_REPLICA_MAX_LAG seconds behind.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counter = itertools.count()
+        self.health = {}
+
+    def choose(self):
+        replicas = settings.SCHEDULE_READ_REPLICAS
+        start = next(self.counter)
+        for offset in range(len(replicas)):
+            alias = replicas[(start + offset) % len(replicas)]
+            if self.is_healthy(alias):
+                return alias
+        return None
+
+    def is_healthy(self, alias):
+        now = timer.monotonic()
+        with self.lock:
+            checked_at, healthy = self.health.get(alias, (None, True))
+            if checked_at is not None and now - checked_at < settings.SCHEDULE_REPLICA_CHECK_INTERVAL:
+                return healthy
+            # Other threads keep the previous answer while this one checks.
+            self.health[alias] = (now, healthy)
+
+        healthy = self.check(alias)
+        with self.lock:
+            self.health[alias] = (now, healthy)
+        return healthy
+
+    def check(self, alias):
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(REPLICA_LAG_SQL)
+                lag = cursor.fetchone()[0]
+        except DatabaseError:
+            logger.warning('Read replica %s is unreachable, reading from the primary', alias, exc_info=True)
+            connections[alias].close()
+            return False
+
+        if lag is not None and lag > settings.SCHEDULE_REPLICA_MAX_LAG:
+            logger.warning('Read replica %s lags %.1fs behind, reading from the primary', alias, lag)
+            return False
+        return True
+
+
+replica_set = ReplicaSet()
+
+
+class ReplicaRouter:
+    """
+    Sends Schedule reads of the views decorated with replica_reads to a read replica. Everything else, writes, reads
+    inside a transaction and reads after a write in the same request stay on the primary (`default`).
+    """
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (state is None or not state.use_replicas or state.wrote or model._meta.label != 'manage_schedule.Schedule'
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return None
+
+        alias = replica_set.choose()
+        if alias is not None:
+            state.replica_used = True
+        return alias
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return None
+
+
+def pin_key(user_id):
+    return f'schedule:primary:{user_id}'
+
+
+def payload_keys(key):
+    """Cache keys to look a payload up under: requests reading from the replicas also take payloads built from one."""
+    state = routing_state.get()
+    if state is not None and state.use_replicas:
+        return [key, key + REPLICA_PAYLOAD_SUFFIX]
+    return [key]
+
+
+def payload_storage():
+    """
+    Cache key suffix and timeout of the payloads built in this request. One built from a replica may miss the latest
+    writes: it is kept apart from the users pinned to the primary, and only for SCHEDULE_REPLICA_MAX_LAG seconds.
+    """
+    state = routing_state.get()
+    if state is not None and state.replica_used:
+        return REPLICA_PAYLOAD_SUFFIX, settings.SCHEDULE_REPLICA_MAX_LAG
+    return '', settings.SCHEDULE_CACHE_TIMEOUT
+
+
+def replica_reads(handler):
+    """
+    Lets a (sync) view handler read the schedule from the replicas, unless the user wrote in the last
+    SCHEDULE_REPLICA_MAX_LAG seconds: a replica may not have their write yet. A queryset streamed after the handler
+    returns must be bound to its database in the handler with `queryset.using(queryset.db)`.
+    """
+    @wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        state = routing_state.get()
+        if state is not None and settings.SCHEDULE_READ_REPLICAS:
+            state.use_replicas = not cache.get(pin_key(request.user.pk))
+        return handler(view, request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Holds the RoutingState of each request and, after a request which wrote, keeps the user's reads on the primary
+    for SCHEDULE_REPLICA_MAX_LAG seconds.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = RoutingState()
+        token = routing_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if state.wrote and settings.SCHEDULE_READ_REPLICAS and request.user.is_authenticated:
+            cache.set(pin_key(request.user.pk), True, timeout=settings.SCHEDULE_REPLICA_MAX_LAG)
+        return response
+
+    async def __acall__(self, request):
+        state = RoutingState()
+        token = routing_state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+
+        if state.wrote and settings.SCHEDULE_READ_REPLICAS and request.user.is_authenticated:
+            await cache.aset(pin_key(request.user.pk), True, timeout=settings.SCHEDULE_REPLICA_MAX_LAG)
+        return response
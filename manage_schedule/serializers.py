@@ -1,11 +1,21 @@
+import json
 from rest_framework import serializers
 from collections import defaultdict
 from .models import Schedule
 from datetime import datetime
-from .utils import is_time_overlap
+from .metrics import serializer_timer, timed_serialization
+from .utils import has_time_conflict, overlap_message
 
 
-class TimeSlotSerializer(serializers.Serializer):
+class TimedRepresentationMixin:
+    """Counts building the representation as serializer time of the request (see manage_schedule.metrics)."""
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+class TimeSlotSerializer(TimedRepresentationMixin, serializers.Serializer):
     record_id = serializers.IntegerField()
     start = serializers.SerializerMethodField()
     stop = serializers.SerializerMethodField()
@@ -18,20 +28,10 @@ class TimeSlotSerializer(serializers.Serializer):
         return obj['end-time']
 
 
-class WeeklyScheduleSerializer(serializers.Serializer):
+class WeeklyScheduleSerializer(TimedRepresentationMixin, serializers.Serializer):
     schedule = serializers.SerializerMethodField()
 
     def get_schedule(self, obj):
-        day_order = {
-            'monday': 0,
-            'tuesday': 1,
-            'wednesday': 2,
-            'thursday': 3,
-            'friday': 4,
-            'saturday': 5,
-            'sunday': 6
-        }
-
         weekly_schedule = defaultdict(list)
 
         for slot in obj:
@@ -43,7 +43,7 @@ class WeeklyScheduleSerializer(serializers.Serializer):
                 "original_time": slot.start_time
             })
 
-        sorted_schedule = sorted(weekly_schedule.items(), key=lambda x: day_order[x[0]])
+        sorted_schedule = sorted(weekly_schedule.items(), key=lambda x: Schedule.DAY_INDEX[x[0]])
 
         result = {}
         for day, slots in sorted_schedule:
@@ -57,13 +57,113 @@ class WeeklyScheduleSerializer(serializers.Serializer):
         return result
 
 
-class RecordSerializer(serializers.ModelSerializer):
+def time_slot(record_id, start_time, end_time, ids):
+    return {
+        "record_id": record_id,
+        "start": start_time.isoformat('minutes'),
+        "stop": end_time.isoformat('minutes'),
+        "ids": ids
+    }
+
+
+@timed_serialization
+def build_weekly_schedule(slots):
+    """
+    Lean counterpart of WeeklyScheduleSerializer. `slots` is an iterable of (record_id, day, start_time, end_time, ids)
+    tuples already ordered by day and start time (see ScheduleQuerySet.weekly_slots), so the response is built in one
+    pass without sorting or serializer field machinery. The rendered output is byte-identical.
+    """
+    result = {}
+    current_day = None
+
+    for record_id, day, start_time, end_time, ids in slots:
+        if day != current_day:
+            day_slots = result[day] = []
+            current_day = day
+        day_slots.append(time_slot(record_id, start_time, end_time, ids))
+
+    return {"schedule": result}
+
+
+class WeeklyScheduleWriter:
+    """
+    Incremental JSON writer of the build_weekly_schedule document, shared by the sync and async streaming responses.
+    Slots must arrive ordered by day and start time.
+    """
+
+    def __init__(self):
+        self.current_day = None
+
+    @staticmethod
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+    def head(self):
+        return '{"schedule":{'
+
+    def slot(self, record_id, day, start_time, end_time, ids):
+        if day != self.current_day:
+            prefix = ('],' if self.current_day else '') + self.dumps(day) + ':['
+            self.current_day = day
+        else:
+            prefix = ','
+
+        return prefix + self.dumps(time_slot(record_id, start_time, end_time, ids))
+
+    def tail(self):
+        return ']}}' if self.current_day else '}}'
+
+
+def stream_weekly_schedule(slots, chunk_size=1000):
+    """
+    Yield the JSON document of build_weekly_schedule piece by piece, so the whole schedule is never held in memory.
+    `slots` has the same format and ordering as for build_weekly_schedule.
+    """
+    writer = WeeklyScheduleWriter()
+    chunk = [writer.head()]
+
+    for slot in slots:
+        chunk.append(writer.slot(*slot))
+
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+
+    chunk.append(writer.tail())
+    yield ''.join(chunk)
+
+
+async def astream_weekly_schedule(slots, chunk_size=1000):
+    """
+    Async counterpart of stream_weekly_schedule for async iterables of slots.
+    """
+    writer = WeeklyScheduleWriter()
+    chunk = [writer.head()]
+
+    async for slot in slots:
+        chunk.append(writer.slot(*slot))
+
+        if len(chunk) >= chunk_size:
+            yield ''.join(chunk)
+            chunk = []
+
+    chunk.append(writer.tail())
+    yield ''.join(chunk)
+
+
+class RecordSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Schedule
         fields = '__all__'
 
+    def validate(self, data):
+        if data['start_time'] >= data['end_time']:
+            raise serializers.ValidationError("End time must be greater than start time.")
+
+        return data
 
-class EditRecordTimelineSerializer(serializers.ModelSerializer):
+
+class EditRecordTimelineSerializer(TimedRepresentationMixin, serializers.ModelSerializer):
     class Meta:
         model = Schedule
         fields = ['start_time', 'end_time']
@@ -88,13 +188,20 @@ class EditRecordTimelineSerializer(serializers.ModelSerializer):
         if start >= end:
             raise serializers.ValidationError("End time must be greater than start time.")
 
-        existing_intervals = Schedule.objects.filter(day=record_day).exclude(id=record_id)
-
-        for existing in existing_intervals:
-            if is_time_overlap(start, end, existing.start_time, existing.end_time):
-                raise serializers.ValidationError(f"Time interval {start} - {end} overlaps with an existing interval!")
+        if has_time_conflict(record_day, start, end, exclude_id=record_id):
+            raise serializers.ValidationError(overlap_message(start, end))
 
         data['start_time'] = start
         data['end_time'] = end
 
         return data
+
+
+class BulkEditRecordTimelineSerializer(TimedRepresentationMixin, serializers.Serializer):
+    id = serializers.IntegerField()
+    start_time = serializers.TimeField(required=False)
+    end_time = serializers.TimeField(required=False)
+
+
+class BulkDeleteRecordsSerializer(serializers.Serializer):
+    record_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False)
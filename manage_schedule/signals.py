@@ -0,0 +1,6 @@
+from django.dispatch import Signal
+
+# Sent after a committed write bumped the schedule version. Receivers get `version` (the new version) and `added` /
+# `removed`: lists of (day, start_time, end_time, ids) slots, or None when the writer does not know them, and `changes`:
+# the ScheduleChange entries logged by the write.
+schedule_version_changed = Signal()
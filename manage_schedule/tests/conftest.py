@@ -0,0 +1,16 @@
+import pytest
+from django.core.cache import cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """The cache outlives the rolled back test transaction, so every test starts with an empty one."""
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    """Views exceeding their query budget fail the test (pytest runs with DEBUG off, which would skip the check)."""
+    settings.SCHEDULE_QUERY_BUDGET_ACTION = 'raise'
@@ -0,0 +1,153 @@
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import User
+from datetime import time
+from manage_schedule.async_views import AsyncGetWeekSchedule
+from manage_schedule.authentication import AsyncJWTAuthentication
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='tester12345', password='testpass123')
+
+
+@pytest.fixture
+def authenticated_client(api_client, user):
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1]),
+        Schedule.objects.create(day='tuesday', start_time=time(14, 0), end_time=time(15, 0), ids=[2]),
+    ]
+
+
+@async_to_sync
+async def read_stream(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    def test_weekly_schedule_matches_sync_view(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get('/async/weekly-schedule/')
+        sync_response = authenticated_client.get('/weekly-schedule/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == sync_response.content
+        assert response['ETag'] == sync_response['ETag']
+
+    def test_weekly_schedule_stream_and_member(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get('/weekly-schedule/?member=2')
+        streamed = authenticated_client.get('/async/weekly-schedule/?member=2&stream=1')
+
+        assert read_stream(streamed) == response.content
+
+    def test_not_modified(self, authenticated_client, sample_schedule):
+        etag = authenticated_client.get('/async/weekly-schedule/')['ETag']
+        response = authenticated_client.get('/async/weekly-schedule/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    def test_jwt_authentication(self, api_client, user, sample_schedule):
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        response = api_client.get('/async/weekly-schedule/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data['schedule']) == ['monday', 'tuesday']
+
+    def test_invalid_token(self, api_client):
+        api_client.credentials(HTTP_AUTHORIZATION='Bearer invalid')
+        response = api_client.get('/async/weekly-schedule/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_inactive_user(self, api_client, user, monkeypatch):
+        monkeypatch.setattr(AsyncGetWeekSchedule, 'authentication_classes', [AsyncJWTAuthentication])
+        user.is_active = False
+        user.save()
+        api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        response = api_client.get('/async/weekly-schedule/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_unauthenticated_request(self, api_client):
+        response = api_client.get('/async/weekly-schedule/')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_create_record(self, authenticated_client, sample_schedule, django_capture_on_commit_callbacks):
+        data = {'day': 'monday', 'start_time': '10:00', 'end_time': '11:00', 'ids': [3]}
+
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            response = authenticated_client.post('/async/create-record/', data=data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.data == 'New record was added successfully!'
+        assert Schedule.objects.get(start_time=time(10, 0)).day_index == 0
+        assert len(callbacks) == 1
+
+    def test_create_overlapping_record(self, authenticated_client, sample_schedule):
+        data = {'day': 'monday', 'start_time': '09:30', 'end_time': '11:00', 'ids': [3]}
+        response = authenticated_client.post('/async/create-record/', data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "overlaps with an existing interval" in response.data
+
+    def test_create_invalid_record(self, authenticated_client):
+        data = {'day': 'monday', 'start_time': 'invalid_time', 'end_time': '11:00', 'ids': [3]}
+        response = authenticated_client.post('/async/create-record/', data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_update_record(self, authenticated_client, sample_schedule):
+        record = sample_schedule[0]
+        response = authenticated_client.patch(f'/async/update-record/?record_id={record.id}',
+                                              data={'end_time': '11:00'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'start_time': '09:00:00', 'end_time': '11:00:00'}
+        assert Schedule.objects.get(id=record.id).end_time == time(11, 0)
+
+    def test_update_overlapping_record(self, authenticated_client, sample_schedule):
+        Schedule.objects.create(day='monday', start_time=time(11, 0), end_time=time(12, 0), ids=[3])
+        record = sample_schedule[0]
+        response = authenticated_client.patch(f'/async/update-record/?record_id={record.id}',
+                                              data={'end_time': '11:30'})
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'overlaps with an existing interval!' in str(response.data)
+
+    def test_update_nonexistent_record(self, authenticated_client):
+        response = authenticated_client.patch('/async/update-record/?record_id=9999', data={'end_time': '11:30'})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_delete_record(self, authenticated_client, sample_schedule):
+        record = sample_schedule[0]
+        response = authenticated_client.delete(f'/async/delete-record/?record_id={record.id}')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert not Schedule.objects.filter(id=record.id).exists()
+
+    def test_delete_nonexistent_record(self, authenticated_client):
+        response = authenticated_client.delete('/async/delete-record/?record_id=9999')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_method_not_allowed(self, authenticated_client):
+        response = authenticated_client.post('/async/delete-record/')
+
+        assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
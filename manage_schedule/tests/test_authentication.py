@@ -0,0 +1,99 @@
+import pytest
+from asgiref.sync import async_to_sync
+from rest_framework import status
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import User
+from datetime import time
+from manage_schedule.authentication import CachedJWTAuthentication, StatelessJWTAuthentication
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='tester12345', password='testpass123')
+
+
+@pytest.fixture
+def token_client(api_client, user):
+    api_client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+    return api_client
+
+
+@pytest.fixture
+def token_request(user):
+    return APIRequestFactory().get('/weekly-schedule/', HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1]),
+        Schedule.objects.create(day='tuesday', start_time=time(14, 0), end_time=time(15, 0), ids=[2]),
+    ]
+
+
+@pytest.mark.django_db
+class TestStatelessJWTAuthentication:
+    url = '/weekly-schedule/'
+
+    @pytest.mark.parametrize('url', ['/weekly-schedule/', '/async/weekly-schedule/'])
+    def test_cached_read_costs_no_queries(self, token_client, sample_schedule, django_assert_num_queries, url):
+        token_client.get(url)
+
+        with django_assert_num_queries(0):
+            response = token_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_user_comes_from_claims(self, token_request, user, django_assert_num_queries):
+        with django_assert_num_queries(0):
+            token_user, _ = StatelessJWTAuthentication().authenticate(token_request)
+
+        assert token_user.id == user.id
+        assert token_user.is_authenticated
+
+    def test_invalid_token(self, api_client):
+        api_client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+
+        response = api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestCachedJWTAuthentication:
+    def test_user_queried_once(self, token_request, user, django_assert_num_queries):
+        authentication = CachedJWTAuthentication()
+
+        with django_assert_num_queries(1):
+            authentication.authenticate(token_request)
+        with django_assert_num_queries(0):
+            cached_user, _ = authentication.authenticate(token_request)
+
+        assert cached_user == user
+
+    def test_deactivation_drops_cached_user(self, token_request, user):
+        authentication = CachedJWTAuthentication()
+        authentication.authenticate(token_request)
+
+        user.is_active = False
+        user.save()
+
+        with pytest.raises(AuthenticationFailed):
+            authentication.authenticate(token_request)
+
+    def test_async_shares_cache(self, token_request, user, django_assert_num_queries):
+        authentication = CachedJWTAuthentication()
+        authentication.authenticate(token_request)
+
+        with django_assert_num_queries(0):
+            cached_user, _ = async_to_sync(authentication.aauthenticate)(token_request)
+
+        assert cached_user == user
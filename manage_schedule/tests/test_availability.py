@@ -0,0 +1,85 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from datetime import time
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1]),
+        Schedule.objects.create(day='monday', start_time=time(10, 0), end_time=time(11, 0), ids=[2]),
+        Schedule.objects.create(day='monday', start_time=time(11, 20), end_time=time(12, 0), ids=[3]),
+        Schedule.objects.create(day='monday', start_time=time(17, 0), end_time=time(19, 0), ids=[4]),
+    ]
+
+
+@pytest.mark.django_db
+class TestGetAvailability:
+    url = '/availability/'
+
+    def test_free_intervals_of_day(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(f"{self.url}?day=monday&from=08:00&to=18:00")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'availability': {'monday': [
+            {'start': '08:00', 'stop': '09:00'},
+            {'start': '11:00', 'stop': '11:20'},
+            {'start': '12:00', 'stop': '17:00'},
+        ]}}
+
+    def test_min_duration(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(f"{self.url}?day=monday&min_duration=30&from=08:00&to=18:00")
+
+        assert response.data['availability']['monday'] == [
+            {'start': '08:00', 'stop': '09:00'},
+            {'start': '12:00', 'stop': '17:00'},
+        ]
+
+    def test_whole_week(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(self.url)
+        availability = response.data['availability']
+
+        assert list(availability) == ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+        assert availability['monday'][-1] == {'start': '19:00', 'stop': '24:00'}
+        assert availability['sunday'] == [{'start': '00:00', 'stop': '24:00'}]
+
+    def test_cached_until_write(self, authenticated_client, sample_schedule, django_assert_num_queries,
+                                django_capture_on_commit_callbacks):
+        authenticated_client.get(f"{self.url}?day=monday")
+
+        with django_assert_num_queries(0):
+            authenticated_client.get(f"{self.url}?day=monday&min_duration=15")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.delete(f"/delete-record/?record_id={sample_schedule[3].id}")
+        response = authenticated_client.get(f"{self.url}?day=monday&from=12:00")
+
+        assert response.data['availability']['monday'] == [{'start': '12:00', 'stop': '24:00'}]
+
+    @pytest.mark.parametrize('query', [
+        'day=someday', 'min_duration=abc', 'min_duration=-5', 'from=8am', 'from=18:00&to=08:00',
+    ])
+    def test_invalid_parameters(self, authenticated_client, query):
+        response = authenticated_client.get(f"{self.url}?{query}")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthenticated_request(self, api_client):
+        response = api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
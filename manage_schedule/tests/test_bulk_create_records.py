@@ -0,0 +1,116 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from datetime import time
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return Schedule.objects.create(
+        day='monday',
+        start_time=time(9, 0),
+        end_time=time(10, 0),
+        ids=[1]
+    )
+
+
+@pytest.mark.django_db
+class TestBulkCreateRecords:
+    url = '/create-records/bulk/'
+
+    def test_successful_bulk_creation(self, authenticated_client, sample_schedule):
+        data = [
+            {'day': 'monday', 'start_time': '10:00', 'end_time': '11:00', 'ids': [2]},
+            {'day': 'monday', 'start_time': '08:00', 'end_time': '09:00', 'ids': [3]},
+            {'day': 'friday', 'start_time': '09:00', 'end_time': '10:00', 'ids': [4]},
+        ]
+        response = authenticated_client.post(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data['created']) == 3
+        assert response.data['errors'] == []
+        assert Schedule.objects.count() == 4
+        assert Schedule.objects.get(id=response.data['created'][2]).day_index == 4
+
+    def test_atomic_batch_rejects_everything(self, authenticated_client, sample_schedule):
+        """Test that one conflict with a stored record rejects the whole batch by default"""
+        data = [
+            {'day': 'monday', 'start_time': '10:00', 'end_time': '11:00', 'ids': [2]},
+            {'day': 'monday', 'start_time': '09:30', 'end_time': '09:45', 'ids': [3]},
+        ]
+        response = authenticated_client.post(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error['index'] for error in response.data['errors']] == [1]
+        assert "overlaps with an existing interval" in str(response.data['errors'][0]['errors'])
+        assert Schedule.objects.count() == 1
+
+    def test_conflicts_inside_batch(self, authenticated_client):
+        """Test that the later of two overlapping new intervals is rejected and the rest is created"""
+        data = [
+            {'day': 'tuesday', 'start_time': '12:00', 'end_time': '13:00', 'ids': [1]},
+            {'day': 'tuesday', 'start_time': '11:00', 'end_time': '12:30', 'ids': [2]},
+            {'day': 'tuesday', 'start_time': '12:30', 'end_time': '14:00', 'ids': [3]},
+            {'day': 'tuesday', 'start_time': 'invalid_time', 'end_time': '14:00', 'ids': [4]},
+        ]
+        response = authenticated_client.post(f"{self.url}?atomic=false", data=data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [error['index'] for error in response.data['errors']] == [0, 3]
+        assert len(response.data['created']) == 2
+        assert list(Schedule.objects.order_by('start_time').values_list('ids', flat=True)) == [[2], [3]]
+
+    def test_rejected_interval_does_not_block_others(self, authenticated_client, sample_schedule):
+        data = [
+            {'day': 'monday', 'start_time': '09:30', 'end_time': '12:00', 'ids': [2]},
+            {'day': 'monday', 'start_time': '11:00', 'end_time': '12:00', 'ids': [3]},
+        ]
+        response = authenticated_client.post(f"{self.url}?atomic=false", data=data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert [error['index'] for error in response.data['errors']] == [0]
+        assert Schedule.objects.count() == 2
+
+    def test_nothing_to_create(self, authenticated_client):
+        data = [{'day': 'monday', 'start_time': '11:00', 'end_time': '10:00', 'ids': [1]}]
+        response = authenticated_client.post(f"{self.url}?atomic=false", data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert Schedule.objects.count() == 0
+
+    def test_not_a_list(self, authenticated_client):
+        data = {'day': 'monday', 'start_time': '09:00', 'end_time': '10:00', 'ids': [1]}
+        response = authenticated_client.post(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == 'Expected a list of records!'
+
+    def test_query_count(self, authenticated_client, sample_schedule, django_assert_num_queries):
+        """Test that the batch costs one conflict query and one INSERT regardless of its size"""
+        data = [{'day': 'monday', 'start_time': f'{hour:02d}:00', 'end_time': f'{hour:02d}:30', 'ids': [hour]}
+                for hour in range(10, 20)]
+
+        # conflict query, savepoint, INSERT, change log lock and INSERT, release savepoint
+        with django_assert_num_queries(6):
+            response = authenticated_client.post(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_unauthenticated_request(self, api_client):
+        response = api_client.post(self.url, data=[], format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
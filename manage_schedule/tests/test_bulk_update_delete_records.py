@@ -0,0 +1,141 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from datetime import time
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1]),
+        Schedule.objects.create(day='monday', start_time=time(10, 0), end_time=time(11, 0), ids=[2]),
+        Schedule.objects.create(day='monday', start_time=time(12, 0), end_time=time(13, 0), ids=[3]),
+        Schedule.objects.create(day='tuesday', start_time=time(9, 0), end_time=time(10, 0), ids=[4]),
+    ]
+
+
+@pytest.mark.django_db
+class TestBulkDeleteRecords:
+    url = '/delete-records/bulk/'
+
+    def test_delete_existing_records(self, authenticated_client, sample_schedule, django_assert_max_num_queries):
+        record_ids = [sample_schedule[0].id, sample_schedule[3].id]
+
+        # savepoint, SELECT FOR UPDATE, DELETE, change log lock and INSERT, release savepoint
+        with django_assert_max_num_queries(6):
+            response = authenticated_client.delete(self.url, data={'record_ids': record_ids}, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == 'The records were deleted successfully!'
+        assert not Schedule.objects.filter(id__in=record_ids).exists()
+        assert Schedule.objects.count() == 2
+
+    def test_delete_with_missing_record(self, authenticated_client, sample_schedule):
+        """Test that nothing is deleted when one of the records does not exist"""
+        record_ids = [sample_schedule[0].id, 9999]
+        response = authenticated_client.delete(self.url, data={'record_ids': record_ids}, format='json')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == {'missing': [9999]}
+        assert Schedule.objects.count() == 4
+
+    def test_delete_without_record_ids(self, authenticated_client):
+        response = authenticated_client.delete(self.url, data={'record_ids': []}, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == 'Record IDs are required to delete! Enter in correct format!'
+
+    def test_unauthenticated_request(self, api_client):
+        response = api_client.delete(self.url, data={'record_ids': [1]}, format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+class TestBulkUpdateRecords:
+    url = '/update-records/bulk/'
+
+    def test_move_records(self, authenticated_client, sample_schedule):
+        data = [
+            {'id': sample_schedule[0].id, 'start_time': '08:00', 'end_time': '09:00'},
+            {'id': sample_schedule[3].id, 'end_time': '11:00'},
+        ]
+        response = authenticated_client.patch(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data[1] == {'id': sample_schedule[3].id, 'start_time': '09:00:00', 'end_time': '11:00:00'}
+        assert Schedule.objects.get(id=sample_schedule[0].id).start_time == time(8, 0)
+        assert Schedule.objects.get(id=sample_schedule[3].id).end_time == time(11, 0)
+
+    def test_swap_records(self, authenticated_client, sample_schedule):
+        """Test that two adjacent records can trade places in one request"""
+        first, second = sample_schedule[0], sample_schedule[1]
+        data = [
+            {'id': first.id, 'start_time': '10:00', 'end_time': '11:00'},
+            {'id': second.id, 'start_time': '09:00', 'end_time': '10:00'},
+        ]
+        response = authenticated_client.patch(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert Schedule.objects.get(id=first.id).start_time == time(10, 0)
+        assert Schedule.objects.get(id=second.id).start_time == time(9, 0)
+
+    def test_overlap_with_rest_of_day(self, authenticated_client, sample_schedule):
+        data = [
+            {'id': sample_schedule[0].id, 'start_time': '11:30', 'end_time': '12:30'},
+        ]
+        response = authenticated_client.patch(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'Time interval 11:30:00 - 12:30:00 overlaps with an existing interval!' in str(response.data)
+        assert Schedule.objects.get(id=sample_schedule[0].id).start_time == time(9, 0)
+
+    def test_overlap_between_moved_records(self, authenticated_client, sample_schedule):
+        data = [
+            {'id': sample_schedule[0].id, 'start_time': '14:00', 'end_time': '15:00'},
+            {'id': sample_schedule[1].id, 'start_time': '14:30', 'end_time': '15:30'},
+        ]
+        response = authenticated_client.patch(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert [error['index'] for error in response.data['errors']] == [1]
+        assert Schedule.objects.get(id=sample_schedule[0].id).start_time == time(9, 0)
+
+    def test_invalid_interval(self, authenticated_client, sample_schedule):
+        data = [{'id': sample_schedule[0].id, 'start_time': '10:30'}]
+        response = authenticated_client.patch(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'End time must be greater than start time.' in str(response.data)
+
+    def test_missing_record(self, authenticated_client, sample_schedule):
+        data = [{'id': 9999, 'start_time': '10:30'}]
+        response = authenticated_client.patch(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response.data == {'missing': [9999]}
+
+    def test_duplicate_record(self, authenticated_client, sample_schedule):
+        data = [{'id': sample_schedule[0].id, 'start_time': '08:30'}, {'id': sample_schedule[0].id}]
+        response = authenticated_client.patch(self.url, data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthenticated_request(self, api_client):
+        response = api_client.patch(self.url, data=[], format='json')
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,104 @@
+import gzip
+import json
+import pytest
+from io import StringIO
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from datetime import time
+from manage_schedule.models import Schedule
+from manage_schedule.renderers import ics_fold
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='tuesday', start_time=time(14, 0), end_time=time(15, 0), ids=[2, 3]),
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1]),
+    ]
+
+
+def read(response):
+    return b''.join(response.streaming_content)
+
+
+@pytest.mark.django_db
+class TestExportSchedule:
+    url = '/weekly-schedule/export/'
+
+    def test_csv(self, authenticated_client, sample_schedule):
+        tuesday, monday = sample_schedule
+        response = authenticated_client.get(self.url, {'format': 'csv'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/csv; charset=utf-8'
+        assert response['Content-Disposition'] == 'attachment; filename="schedule.csv"'
+        assert read(response).decode() == (
+            'record_id,day,start_time,end_time,ids\r\n'
+            f'{monday.id},monday,09:00:00,10:00:00,[1]\r\n'
+            f'{tuesday.id},tuesday,14:00:00,15:00:00,"[2, 3]"\r\n'
+        )
+
+    def test_ndjson(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(self.url, {'format': 'ndjson'})
+
+        lines = [json.loads(line) for line in read(response).decode().splitlines()]
+        assert [line['day'] for line in lines] == ['monday', 'tuesday']
+        assert lines[1] == {'record_id': sample_schedule[0].id, 'day': 'tuesday', 'start_time': '14:00:00',
+                            'end_time': '15:00:00', 'ids': [2, 3]}
+
+    def test_ics(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(self.url, HTTP_ACCEPT='text/calendar')
+
+        assert response['Content-Type'] == 'text/calendar; charset=utf-8'
+        content = read(response).decode()
+        assert content.startswith('BEGIN:VCALENDAR\r\n') and content.endswith('END:VCALENDAR\r\n')
+        assert content.count('BEGIN:VEVENT') == 2
+        assert 'DTSTART:20240102T140000\r\nDTEND:20240102T150000\r\nRRULE:FREQ=WEEKLY;BYDAY=TU\r\n' in content
+        assert 'SUMMARY:Members: 2\\, 3\r\n' in content
+
+    def test_ics_fold(self):
+        folded = ics_fold('SUMMARY:' + 'é' * 100)
+
+        assert all(len(line.encode()) <= 75 for line in folded.split('\r\n'))
+        assert folded.replace('\r\n ', '') == 'SUMMARY:' + 'é' * 100 + '\r\n'
+
+    def test_gzip(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(self.url, {'format': 'ndjson'}, HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert len(gzip.decompress(read(response)).decode().splitlines()) == 2
+
+    def test_export_is_importable(self, authenticated_client, sample_schedule, tmp_path):
+        path = tmp_path / 'schedule.csv'
+        path.write_bytes(read(authenticated_client.get(self.url)))
+        Schedule.objects.all().delete()
+
+        call_command('import_schedule', str(path), stdout=StringIO())
+
+        assert sorted(Schedule.objects.values_list('day', 'ids')) == [('monday', [1]), ('tuesday', [2, 3])]
+
+    def test_unknown_format(self, authenticated_client):
+        response = authenticated_client.get(self.url, {'format': 'xml'})
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert response['Content-Type'] == 'application/json'
+
+    def test_unauthenticated_request(self, api_client):
+        response = api_client.get(self.url, {'format': 'ics'})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['Content-Type'] == 'application/json'
@@ -1,9 +1,11 @@
 import pytest
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.test import APIClient
 from django.contrib.auth.models import User
 from datetime import time
 from manage_schedule.models import Schedule
+from manage_schedule.serializers import WeeklyScheduleSerializer, build_weekly_schedule
 
 
 @pytest.fixture
@@ -126,3 +128,68 @@ class TestGetWeekSchedule:
 
         assert 'sunday' not in schedule_data
         assert 'saturday' not in schedule_data
+
+    def test_streamed_schedule_matches(self, authenticated_client, sample_schedule):
+        """Test that the streamed schedule is byte-identical to the regular response"""
+        Schedule.objects.create(day='sunday', start_time=time(8, 0), end_time=time(9, 0), ids=[4, 'ü'])
+        Schedule.objects.create(day='monday', start_time=time(7, 0), end_time=time(8, 0), ids=[])
+
+        response = authenticated_client.get(self.url)
+        streamed = authenticated_client.get(f"{self.url}?stream=1")
+
+        assert streamed.status_code == status.HTTP_200_OK
+        assert streamed['Content-Type'] == 'application/json'
+        assert b''.join(streamed.streaming_content) == response.content
+
+    def test_streamed_empty_schedule(self, authenticated_client):
+        streamed = authenticated_client.get(f"{self.url}?stream=1")
+
+        assert b''.join(streamed.streaming_content) == b'{"schedule":{}}'
+
+    def test_lean_serializer_matches(self, sample_schedule):
+        """Test that the lean serializer renders byte-identical output to WeeklyScheduleSerializer"""
+        Schedule.objects.create(day='sunday', start_time=time(8, 0), end_time=time(9, 0), ids=[4, 'ü'])
+        Schedule.objects.create(day='monday', start_time=time(7, 0), end_time=time(8, 30), ids=[])
+
+        legacy = JSONRenderer().render(WeeklyScheduleSerializer(Schedule.objects.all()).data)
+        lean = JSONRenderer().render(build_weekly_schedule(Schedule.objects.weekly_slots()))
+
+        assert lean == legacy
+
+    def test_single_query(self, authenticated_client, sample_schedule, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            authenticated_client.get(self.url)
+
+    def test_day_index(self, sample_schedule):
+        assert [record.day_index for record in sample_schedule] == [0, 0, 1]
+
+    def test_member_schedule(self, authenticated_client, sample_schedule):
+        """Test that only the slots of the requested member are returned"""
+        Schedule.objects.create(day='friday', start_time=time(8, 0), end_time=time(9, 0), ids=[2, 5])
+        Schedule.objects.create(day='friday', start_time=time(9, 0), end_time=time(10, 0), ids=[22])
+
+        response = authenticated_client.get(f"{self.url}?member=2")
+
+        assert response.status_code == status.HTTP_200_OK
+        schedule_data = response.data['schedule']
+        assert list(schedule_data) == ['monday', 'friday']
+        assert [slot['ids'] for slot in schedule_data['monday']] == [[2]]
+        assert [slot['ids'] for slot in schedule_data['friday']] == [[2, 5]]
+
+    def test_member_schedule_streamed(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(f"{self.url}?member=3")
+        streamed = authenticated_client.get(f"{self.url}?member=3&stream=1")
+
+        assert b''.join(streamed.streaming_content) == response.content
+        assert list(response.data['schedule']) == ['tuesday']
+
+    def test_member_uses_containment(self):
+        query = str(Schedule.objects.weekly_slots().filter(ids__contains=[42]).query)
+
+        assert '@>' in query
+
+    def test_invalid_member(self, authenticated_client):
+        response = authenticated_client.get(f"{self.url}?member=abc")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data == 'Member ID must be an integer!'
@@ -0,0 +1,182 @@
+import pytest
+import threading
+from datetime import time, timedelta
+from io import StringIO
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+from manage_schedule.idempotency import request_fingerprint
+from manage_schedule.models import IdempotencyKey, Schedule, ScheduleChange
+
+RECORD = {'day': 'monday', 'start_time': '09:00', 'end_time': '10:00', 'ids': [1, 2]}
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+def post(client, data=RECORD, key='key-1', url='/create-record/'):
+    return client.post(url, data, format='json', headers={'Idempotency-Key': key})
+
+
+@pytest.mark.django_db
+class TestIdempotentCreate:
+    def test_retry_replays_the_response(self, authenticated_client, django_assert_num_queries):
+        first = post(authenticated_client)
+
+        with django_assert_num_queries(1):
+            retry = post(authenticated_client)
+
+        assert first.status_code == retry.status_code == status.HTTP_201_CREATED
+        assert retry.data == 'New record was added successfully!'
+        assert retry['Idempotent-Replayed'] == 'true'
+        assert 'Idempotent-Replayed' not in first
+        assert Schedule.objects.count() == 1
+        assert ScheduleChange.objects.count() == 1
+
+    def test_error_responses_are_replayed(self, authenticated_client):
+        first = post(authenticated_client, {**RECORD, 'day': 'someday'})
+        Schedule.objects.create(day='monday', start_time=time(12, 0), end_time=time(13, 0), ids=[3])
+
+        retry = post(authenticated_client, {**RECORD, 'day': 'someday'})
+
+        assert first.status_code == retry.status_code == status.HTTP_400_BAD_REQUEST
+        assert retry.data == first.data
+
+    def test_without_key(self, authenticated_client):
+        assert authenticated_client.post('/create-record/', RECORD, format='json').status_code == 201
+        assert authenticated_client.post('/create-record/', RECORD, format='json').status_code == 400
+        assert not IdempotencyKey.objects.exists()
+
+    def test_different_keys(self, authenticated_client):
+        post(authenticated_client, key='key-1')
+
+        assert post(authenticated_client, key='key-2').status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_key_reused_for_another_request(self, authenticated_client):
+        post(authenticated_client)
+
+        response = post(authenticated_client, {**RECORD, 'day': 'tuesday'})
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+        assert not Schedule.objects.filter(day='tuesday').exists()
+
+    @pytest.mark.parametrize('key', ['', 'k' * 256])
+    def test_invalid_key(self, authenticated_client, key):
+        assert post(authenticated_client, key=key).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_keys_are_scoped_to_the_user(self, authenticated_client):
+        post(authenticated_client)
+        other = APIClient()
+        other.force_authenticate(user=User.objects.create_user(username='other12345', password='testpass123'))
+
+        response = post(other, {**RECORD, 'day': 'tuesday'})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert Schedule.objects.count() == 2
+
+    def test_expired_key_is_reused(self, authenticated_client):
+        post(authenticated_client)
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = post(authenticated_client, {**RECORD, 'day': 'tuesday'})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert IdempotencyKey.objects.get().expires_at > timezone.now()
+
+    def test_purge_expired_keys(self, authenticated_client):
+        post(authenticated_client, key='key-1')
+        post(authenticated_client, {**RECORD, 'day': 'tuesday'}, key='key-2')
+        IdempotencyKey.objects.filter(key='key-1').update(expires_at=timezone.now())
+
+        call_command('purge_idempotency_keys', stdout=StringIO())
+
+        assert list(IdempotencyKey.objects.values_list('key', flat=True)) == ['key-2']
+
+
+@pytest.mark.django_db
+class TestIdempotentBulkWrites:
+    def test_bulk_create(self, authenticated_client):
+        records = [RECORD, {**RECORD, 'day': 'tuesday'}]
+        first = post(authenticated_client, records, url='/create-records/bulk/')
+
+        retry = post(authenticated_client, records, url='/create-records/bulk/')
+
+        assert retry.status_code == status.HTTP_201_CREATED
+        assert retry.data == first.data
+        assert Schedule.objects.count() == 2
+
+    def test_bulk_delete(self, authenticated_client):
+        record = Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1])
+        data = {'record_ids': [record.id]}
+        first = authenticated_client.delete('/delete-records/bulk/', data, format='json',
+                                            headers={'Idempotency-Key': 'key-1'})
+
+        retry = authenticated_client.delete('/delete-records/bulk/', data, format='json',
+                                            headers={'Idempotency-Key': 'key-1'})
+
+        assert first.status_code == retry.status_code == status.HTTP_200_OK
+        assert retry['Idempotent-Replayed'] == 'true'
+
+    def test_bulk_update(self, authenticated_client):
+        record = Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1])
+        data = [{'record_id': record.id, 'start_time': '11:00', 'end_time': '12:00'}]
+        first = authenticated_client.patch('/update-records/bulk/', data, format='json',
+                                           headers={'Idempotency-Key': 'key-1'})
+        Schedule.objects.filter(id=record.id).update(start_time=time(14, 0), end_time=time(15, 0))
+
+        retry = authenticated_client.patch('/update-records/bulk/', data, format='json',
+                                           headers={'Idempotency-Key': 'key-1'})
+
+        assert first.status_code == retry.status_code == status.HTTP_200_OK
+        assert retry.data == first.data
+        assert Schedule.objects.get().start_time == time(14, 0)
+
+    def test_same_key_on_another_endpoint(self, authenticated_client):
+        post(authenticated_client)
+
+        response = post(authenticated_client, [{**RECORD, 'day': 'tuesday'}], url='/create-records/bulk/')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_retry_waits_for_the_first_request(authenticated_client):
+    """The retry runs while the first request has not committed: it returns the first response and writes nothing."""
+    user = User.objects.get()
+    request = authenticated_client.post('/create-record/', RECORD, format='json').wsgi_request
+    Schedule.objects.all().delete()
+    stored = threading.Event()
+    retried = threading.Event()
+
+    def first_request():
+        with transaction.atomic():
+            IdempotencyKey.objects.create(user=user, endpoint='CreateRecord.post', key='key-1',
+                                          fingerprint=request_fingerprint(request), status=201, body='First!',
+                                          expires_at=timezone.now() + timedelta(hours=1))
+            stored.set()
+            retried.wait(timeout=0.5)
+        connection.close()
+
+    thread = threading.Thread(target=first_request)
+    thread.start()
+    stored.wait()
+    timer = threading.Timer(0.2, retried.set)
+    timer.start()
+    response = post(authenticated_client)
+    thread.join()
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert response.data == 'First!'
+    assert not Schedule.objects.exists()
@@ -0,0 +1,95 @@
+import json
+import pytest
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from datetime import time
+from manage_schedule.cache import get_schedule_version
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def sample_schedule():
+    return Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1])
+
+
+def import_schedule(path, *args):
+    stdout = StringIO()
+    call_command('import_schedule', str(path), *args, stdout=stdout)
+    return stdout.getvalue()
+
+
+def read_errors(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file]
+
+
+@pytest.mark.django_db
+class TestImportSchedule:
+    def test_import_csv(self, tmp_path, django_capture_on_commit_callbacks):
+        path = tmp_path / 'schedule.csv'
+        path.write_text('day,start_time,end_time,ids\n'
+                        'tuesday,14:00,15:00,[2]\n'
+                        'Monday,09:00,10:30:15,1;3\n')
+        version = get_schedule_version()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            output = import_schedule(path)
+
+        assert 'Imported 2 records' in output
+        assert list(Schedule.objects.order_by('day_index').values_list('day', 'day_index', 'start_time', 'end_time',
+                                                                       'ids')) == [
+            ('monday', 0, time(9, 0), time(10, 30, 15), [1, 3]),
+            ('tuesday', 1, time(14, 0), time(15, 0), [2]),
+        ]
+        assert get_schedule_version() > version
+        assert not (tmp_path / 'schedule.csv.errors.jsonl').exists()
+
+    def test_rejected_rows(self, tmp_path, sample_schedule):
+        path = tmp_path / 'schedule.jsonl'
+        rows = [
+            {'day': 'funday', 'start_time': '09:00', 'end_time': '10:00', 'ids': [1]},
+            {'day': 'monday', 'start_time': '09:30', 'end_time': '10:30', 'ids': [2]},
+            {'day': 'friday', 'start_time': '12:00', 'end_time': '11:00', 'ids': [3]},
+            {'day': 'friday', 'start_time': '08:00', 'end_time': '09:00', 'ids': [4]},
+            {'day': 'friday', 'start_time': '08:30', 'end_time': '08:45', 'ids': [5]},
+            {'day': 'friday', 'start_time': '09:00', 'end_time': '10:00', 'ids': [6]},
+        ]
+        path.write_text('\n'.join(json.dumps(row) for row in rows) + '\nnot json\n')
+
+        output = import_schedule(path, '--errors', str(tmp_path / 'errors.jsonl'))
+
+        assert 'Imported 2 records' in output and 'rejected 5' in output
+        errors = read_errors(tmp_path / 'errors.jsonl')
+        assert [error['line'] for error in errors] == [1, 2, 3, 5, 7]
+        assert errors[0]['error'] == '"funday" is not a valid choice.'
+        assert errors[1]['error'].endswith(f'(record {sample_schedule.id})')
+        assert errors[2]['error'] == 'End time must be greater than start time.'
+        assert errors[3]['error'] == 'Time interval 08:30 - 08:45 overlaps with an existing interval! (line 4)'
+        assert errors[4]['row'] == 'not json'
+        assert sorted(Schedule.objects.filter(day='friday').values_list('start_time', flat=True)) == [time(8, 0),
+                                                                                                       time(9, 0)]
+
+    def test_dry_run(self, tmp_path):
+        path = tmp_path / 'schedule.csv'
+        path.write_text('day,start_time,end_time,ids\nmonday,09:00,10:00,[1]\n')
+
+        output = import_schedule(path, '--dry-run')
+
+        assert 'Validated 1 records' in output
+        assert not Schedule.objects.exists()
+
+    def test_bulk_create_fallback(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(connection, 'vendor', 'sqlite')
+        path = tmp_path / 'schedule.csv'
+        path.write_text('day,start_time,end_time,ids\n' +
+                        ''.join(f'sunday,{hour:02d}:00,{hour:02d}:30,[{hour}]\n' for hour in range(10)))
+
+        import_schedule(path, '--batch-size', '3')
+
+        assert Schedule.objects.filter(day='sunday', day_index=6).count() == 10
+
+    def test_missing_file(self, tmp_path):
+        with pytest.raises(CommandError):
+            import_schedule(tmp_path / 'missing.csv')
@@ -0,0 +1,147 @@
+import logging
+import pytest
+from asgiref.sync import async_to_sync
+from datetime import time
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import User
+from django.test import AsyncClient
+from django.db import connection
+from manage_schedule.metrics import Histogram, registry, render_pool_metrics
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1])
+
+
+def scrape(client):
+    response = client.get('/metrics')
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+
+    samples = {}
+    for line in response.content.decode().splitlines():
+        if not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = Histogram('test_seconds', "Test.", ('endpoint',), (0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        histogram.observe(('a',), value)
+
+    assert list(histogram.render())[2:] == [
+        'test_seconds_bucket{endpoint="a",le="0.1"} 2',
+        'test_seconds_bucket{endpoint="a",le="1"} 3',
+        'test_seconds_bucket{endpoint="a",le="+Inf"} 4',
+        'test_seconds_sum{endpoint="a"} 3.65',
+        'test_seconds_count{endpoint="a"} 4',
+    ]
+
+
+@pytest.mark.django_db
+class TestRequestMetrics:
+    labels = 'endpoint="get-weekly-schedule",method="GET"'
+
+    def test_records_request(self, authenticated_client, sample_schedule):
+        before = scrape(authenticated_client)
+
+        response = authenticated_client.get('/weekly-schedule/')
+        assert response.status_code == status.HTTP_200_OK
+
+        after = scrape(authenticated_client)
+        count = f'schedule_http_request_duration_seconds_count{{{self.labels},status="200"}}'
+        assert after[count] == before.get(count, 0) + 1
+        queries = f'schedule_http_db_queries_total{{{self.labels}}}'
+        assert after[queries] > before.get(queries, 0)
+        assert after[f'schedule_http_db_query_seconds_total{{{self.labels}}}'] > 0
+        assert after[f'schedule_http_serializer_seconds_total{{{self.labels}}}'] > 0
+        size = f'schedule_http_response_size_bytes_sum{{{self.labels}}}'
+        assert after[size] == before.get(size, 0) + len(response.content)
+
+    def test_records_asgi_request(self, authenticated_client, sample_schedule):
+        labels = 'endpoint="async-get-weekly-schedule",method="GET"'
+        before = scrape(authenticated_client)
+        token = AccessToken.for_user(User.objects.get())
+
+        response = async_to_sync(AsyncClient().get)('/async/weekly-schedule/',
+                                                           headers={'Authorization': f'Bearer {token}'})
+        assert response.status_code == status.HTTP_200_OK
+
+        after = scrape(authenticated_client)
+        count = f'schedule_http_request_duration_seconds_count{{{labels},status="200"}}'
+        assert after[count] == before.get(count, 0) + 1
+        queries = f'schedule_http_db_queries_total{{{labels}}}'
+        assert after[queries] > before.get(queries, 0)
+
+    def test_unmatched_path(self, api_client):
+        api_client.get('/no-such-page/')
+
+        assert 'schedule_http_request_duration_seconds_count{endpoint="unmatched",method="GET",status="404"}' \
+            in scrape(api_client)
+
+    def test_slow_request_log(self, authenticated_client, sample_schedule, settings, caplog):
+        settings.SCHEDULE_SLOW_REQUEST_SECONDS = 0
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get())
+
+        with caplog.at_level(logging.WARNING, logger='manage_schedule.slow_requests'):
+            client.get('/weekly-schedule/')
+
+        assert 'Slow request GET /weekly-schedule/' in caplog.text
+        assert 'FROM "manage_schedule_schedule"' in caplog.text
+
+    def test_no_slow_request_log_by_default(self, authenticated_client, sample_schedule, caplog):
+        with caplog.at_level(logging.WARNING, logger='manage_schedule.slow_requests'):
+            authenticated_client.get('/weekly-schedule/')
+
+        assert not caplog.records
+
+    def test_token(self, api_client, settings):
+        settings.SCHEDULE_METRICS_TOKEN = 'secret'
+
+        assert api_client.get('/metrics').status_code == status.HTTP_401_UNAUTHORIZED
+        assert api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret').status_code == status.HTTP_200_OK
+
+    def test_disabled(self, authenticated_client, sample_schedule, settings):
+        settings.SCHEDULE_METRICS = False
+        client = APIClient()
+        client.force_authenticate(user=User.objects.get())
+        before = registry.render()
+
+        assert client.get('/weekly-schedule/').status_code == status.HTTP_200_OK
+        assert client.get('/metrics').status_code == status.HTTP_404_NOT_FOUND
+        assert registry.render() == before
+
+
+@pytest.mark.django_db
+def test_pool_metrics():
+    psycopg_pool = pytest.importorskip('psycopg_pool')
+
+    with psycopg_pool.ConnectionPool(kwargs=connection.get_connection_params(), min_size=2, max_size=4) as pool:
+        pool.wait()
+        with pool.connection():
+            lines = list(render_pool_metrics({'default': pool}))
+
+    assert 'schedule_db_pool_max_connections{database="default"} 4' in lines
+    assert 'schedule_db_pool_connections{database="default"} 2' in lines
+    assert 'schedule_db_pool_available_connections{database="default"} 1' in lines
+    assert 'schedule_db_pool_requests_total{database="default"} 1' in lines
+    assert '# TYPE schedule_db_pool_wait_seconds_total counter' in lines
@@ -0,0 +1,138 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.db import transaction
+from datetime import time
+from manage_schedule import occupancy as occupancy_module
+from manage_schedule.cache import schedule_changed
+from manage_schedule.models import Schedule
+from manage_schedule.occupancy import OccupancyMap, occupancy
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(9, 30), ids=[1, 2]),
+        Schedule.objects.create(day='monday', start_time=time(9, 30), end_time=time(9, 40, 30), ids=[3]),
+        Schedule.objects.create(day='sunday', start_time=time(23, 45), end_time=time(23, 59, 59), ids=[]),
+    ]
+
+
+@pytest.mark.django_db
+class TestOccupancyMap:
+    def test_is_free(self, sample_schedule):
+        occupancy.synced()
+
+        assert occupancy.is_free('monday', time(9, 41), time(10, 0))
+        assert not occupancy.is_free('monday', time(9, 40, 30), time(10, 0))
+        assert not occupancy.is_free('monday', time(8, 0), time(9, 1))
+        assert occupancy.is_free('tuesday', time(9, 0), time(10, 0))
+
+    def test_incremental_update(self, authenticated_client, sample_schedule, django_assert_num_queries,
+                                django_capture_on_commit_callbacks):
+        """Test that writes of this process update the map without a rebuild"""
+        occupancy.synced()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            data = {'day': 'tuesday', 'start_time': '10:00', 'end_time': '11:00', 'ids': [4]}
+            authenticated_client.post('/create-record/', data=data, format='json')
+            authenticated_client.patch(f"/update-record/?record_id={sample_schedule[0].id}",
+                                       data={'start_time': '08:00'})
+            authenticated_client.delete(f"/delete-record/?record_id={sample_schedule[2].id}")
+
+        with django_assert_num_queries(0):
+            occupancy.synced()
+
+        assert not occupancy.is_free('tuesday', time(10, 30), time(10, 45))
+        assert not occupancy.is_free('monday', time(8, 0), time(8, 30))
+        assert occupancy.is_free('sunday', time(23, 0), time(23, 59))
+
+    def test_free_interval_skips_conflict_query(self, authenticated_client, sample_schedule,
+                                                django_assert_num_queries):
+        occupancy.synced()
+        data = {'day': 'monday', 'start_time': '10:00', 'end_time': '11:00', 'ids': [4]}
+
+        with django_assert_num_queries(5):  # savepoint, INSERT, change log lock and INSERT, release savepoint
+            response = authenticated_client.post('/create-record/', data=data, format='json')
+
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_busy_interval_is_checked(self, authenticated_client, sample_schedule):
+        occupancy.synced()
+        data = {'day': 'monday', 'start_time': '09:15', 'end_time': '11:00', 'ids': [4]}
+
+        response = authenticated_client.post('/create-record/', data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unknown_write_marks_map_stale(self, authenticated_client, sample_schedule,
+                                           django_capture_on_commit_callbacks):
+        occupancy.synced()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            with transaction.atomic():
+                Schedule.objects.filter(id=sample_schedule[0].id).delete()
+                schedule_changed()
+
+        assert not occupancy.is_free('monday', time(9, 0), time(9, 15))
+        assert occupancy.synced().is_free('monday', time(9, 0), time(9, 15))
+
+    def test_removal_keeps_shared_minutes(self):
+        occupancy_map = OccupancyMap()
+        occupancy_map.version = 1
+        occupancy_map.apply(2, added=[('monday', time(9, 0), time(9, 30, 30), [1]),
+                                      ('monday', time(9, 30, 30), time(10, 0), [2])])
+        occupancy_map.apply(3, removed=[('monday', time(9, 30, 30), time(10, 0), [2])])
+
+        assert occupancy_map.days[0] == ((1 << 31) - 1) << 540
+
+    def test_pure_python_heatmap(self, sample_schedule, monkeypatch):
+        """Test that the heatmap does not depend on NumPy"""
+        expected = occupancy.synced().heatmap(30)['density']
+        monkeypatch.setattr(occupancy_module, 'numpy', None)
+
+        occupancy_map = OccupancyMap()
+        occupancy_map.rebuild()
+
+        assert occupancy_map.members is None
+        assert occupancy_map.heatmap(30) == {'bucket': 30, 'density': expected}
+
+
+@pytest.mark.django_db
+class TestGetScheduleHeatmap:
+    url = '/weekly-schedule/heatmap/'
+
+    def test_heatmap(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get(self.url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['bucket'] == 15
+        monday = response.data['density']['monday']
+        assert len(monday) == 96
+        assert monday[35:40] == [0.0, 1.0, 1.0, 0.733, 0.0]
+        assert response.data['members']['monday'][36:39] == [2.0, 2.0, 0.733]
+        assert response.data['density']['sunday'][-1] == 1.0
+        assert response.data['density']['friday'] == [0.0] * 96
+
+    def test_invalid_bucket(self, authenticated_client):
+        response = authenticated_client.get(f"{self.url}?bucket=7")
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthenticated_request(self, api_client):
+        response = api_client.get(self.url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,99 @@
+import gzip
+import json
+import pytest
+from io import StringIO
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.core.management import call_command
+from manage_schedule import openapi
+from manage_schedule.openapi import get_schema_documents
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def schema_dir(settings, tmp_path):
+    settings.SCHEDULE_OPENAPI_DIR = tmp_path
+    get_schema_documents.cache_clear()
+    yield tmp_path
+    get_schema_documents.cache_clear()
+
+
+class TestSchema:
+    def test_json(self, api_client, schema_dir):
+        response = api_client.get('/swagger.json')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/json'
+        schema = json.loads(response.content)
+        assert '/weekly-schedule/' in schema['paths'] and '/update-record/' in schema['paths']
+        assert (schema_dir / 'openapi.json').read_bytes() == response.content
+
+    def test_yaml(self, api_client, schema_dir):
+        response = api_client.get('/swagger.yaml')
+
+        assert response['Content-Type'] == 'application/yaml'
+        assert response.content.startswith(b"swagger: '2.0'")
+
+    def test_etag(self, api_client, schema_dir):
+        etag = api_client.get('/swagger.json')['ETag']
+        response = api_client.get('/swagger.json', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag and not response.content
+
+    def test_gzip(self, api_client, schema_dir):
+        plain = api_client.get('/swagger.json')
+        response = api_client.get('/swagger.json', HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        assert response['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.content) == plain.content
+        assert response['ETag'] != plain['ETag']
+        assert 'Accept-Encoding' in response['Vary']
+
+    def test_generated_once(self, api_client, schema_dir, monkeypatch):
+        api_client.get('/swagger.json')
+        get_schema_documents.cache_clear()
+        monkeypatch.setattr(openapi, 'generate_schemas', lambda: pytest.fail('The stored schema is current'))
+
+        assert api_client.get('/swagger.json').status_code == status.HTTP_200_OK
+
+    def test_regenerated_for_new_code(self, api_client, schema_dir):
+        call_command('generate_schema', stdout=StringIO())
+        (schema_dir / 'openapi.json').write_bytes(b'{}')
+        (schema_dir / 'fingerprint').write_text('previous deployment')
+
+        assert '/weekly-schedule/' in api_client.get('/swagger.json').json()['paths']
+        assert (schema_dir / 'openapi.json').read_bytes() != b'{}'
+
+    def test_read_only_directory(self, api_client, schema_dir, settings):
+        (schema_dir / 'file').write_text('')
+        settings.SCHEDULE_OPENAPI_DIR = schema_dir / 'file' / 'openapi'
+
+        assert api_client.get('/swagger.json').status_code == status.HTTP_200_OK
+
+    def test_ui_loads_precomputed_schema(self, api_client, schema_dir):
+        response = api_client.get('/swagger/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert b'"url": "/swagger.json"' in response.content
+
+
+class TestGenerateSchemaCommand:
+    def test_generate(self, schema_dir):
+        out = StringIO()
+        call_command('generate_schema', stdout=out)
+
+        assert 'Generated' in out.getvalue()
+        assert (schema_dir / 'openapi.yaml').exists()
+
+        out = StringIO()
+        call_command('generate_schema', stdout=out)
+        assert 'up to date' in out.getvalue()
+
+        out = StringIO()
+        call_command('generate_schema', '--force', stdout=out)
+        assert 'Generated' in out.getvalue()
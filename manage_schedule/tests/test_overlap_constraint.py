@@ -0,0 +1,81 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from datetime import time
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return Schedule.objects.create(
+        day='monday',
+        start_time=time(9, 0),
+        end_time=time(10, 0),
+        ids=[1]
+    )
+
+
+@pytest.mark.django_db
+class TestOverlapConstraint:
+    def test_database_rejects_overlap(self, sample_schedule):
+        """Test that the exclusion constraint rejects an overlapping row written past the application check"""
+        with pytest.raises(IntegrityError), transaction.atomic():
+            Schedule.objects.create(day='monday', start_time=time(9, 30), end_time=time(10, 30), ids=[2])
+
+    def test_touching_and_other_day_intervals_are_allowed(self, sample_schedule):
+        Schedule.objects.create(day='monday', start_time=time(10, 0), end_time=time(11, 0), ids=[2])
+        Schedule.objects.create(day='tuesday', start_time=time(9, 0), end_time=time(10, 0), ids=[3])
+
+        assert Schedule.objects.count() == 3
+
+    def test_model_validation(self, sample_schedule):
+        """Test that model validation (used by the admin) reports the constraint"""
+        record = Schedule(day='monday', start_time=time(9, 30), end_time=time(10, 30), ids=[2])
+
+        with pytest.raises(ValidationError):
+            record.validate_constraints()
+
+    def test_create_race_is_reported_as_overlap(self, authenticated_client, sample_schedule, monkeypatch):
+        """Test that a create which passed the check concurrently still gets the overlap message"""
+        monkeypatch.setattr('manage_schedule.views.has_time_conflict', lambda *args, **kwargs: False)
+
+        data = {'day': 'monday', 'start_time': '09:30', 'end_time': '10:30', 'ids': [2]}
+        response = authenticated_client.post('/create-record/', data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "overlaps with an existing interval" in response.data
+        assert Schedule.objects.count() == 1
+
+    def test_update_race_is_reported_as_overlap(self, authenticated_client, sample_schedule, monkeypatch):
+        """Test that an update which passed the check concurrently still gets the overlap message"""
+        monkeypatch.setattr('manage_schedule.serializers.has_time_conflict', lambda *args, **kwargs: False)
+        other = Schedule.objects.create(day='monday', start_time=time(11, 0), end_time=time(12, 0), ids=[2])
+
+        data = {'start_time': '10:30', 'end_time': '11:30'}
+        response = authenticated_client.patch(f"/update-record/?record_id={sample_schedule.id}", data=data)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'Time interval 10:30:00 - 11:30:00 overlaps with an existing interval!' in str(response.data)
+        assert Schedule.objects.get(id=other.id).start_time == time(11, 0)
+
+    def test_create_with_reversed_interval(self, authenticated_client):
+        data = {'day': 'monday', 'start_time': '11:00', 'end_time': '10:00', 'ids': [1]}
+        response = authenticated_client.post('/create-record/', data=data, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'End time must be greater than start time.' in str(response.data)
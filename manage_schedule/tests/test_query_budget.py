@@ -0,0 +1,105 @@
+import logging
+import pytest
+from datetime import time
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.db import transaction
+from manage_schedule.models import Schedule
+from manage_schedule.query_budget import QueryBudgetExceeded, query_budget
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def large_schedule():
+    """Seven days of 20-minute records from 00:00 to 20:00 with several members each."""
+    records = [Schedule(day=day, day_index=Schedule.DAY_INDEX[day], start_time=time(hour, minute),
+                        end_time=time(hour, minute + 19), ids=[hour, minute, 100 + hour])
+               for day in Schedule.DAY_INDEX for hour in range(20) for minute in (0, 20, 40)]
+    return Schedule.objects.bulk_create(records)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    def test_within_budget(self):
+        with query_budget(1):
+            list(Schedule.objects.all())
+
+    def test_exceeded(self):
+        with pytest.raises(QueryBudgetExceeded, match='counting ran 2 queries, its budget is 1'):
+            with query_budget(1, 'counting'):
+                Schedule.objects.count()
+                Schedule.objects.count()
+
+    def test_decorator(self):
+        @query_budget(0)
+        def count():
+            return Schedule.objects.count()
+
+        with pytest.raises(QueryBudgetExceeded, match='count ran 1 queries'):
+            count()
+
+    def test_savepoints_not_counted(self):
+        with query_budget(1):
+            with transaction.atomic():
+                Schedule.objects.count()
+
+    def test_log(self, settings, caplog):
+        settings.SCHEDULE_QUERY_BUDGET_ACTION = 'log'
+
+        with caplog.at_level(logging.WARNING, logger='manage_schedule.query_budget'):
+            with query_budget(0, 'counting'):
+                Schedule.objects.count()
+
+        assert 'counting ran 1 queries, its budget is 0' in caplog.text
+        assert 'SELECT COUNT(*)' in caplog.text
+
+    def test_disabled(self, settings):
+        settings.SCHEDULE_QUERY_BUDGET_ACTION = None
+
+        with query_budget(0):
+            Schedule.objects.count()
+
+
+@pytest.mark.django_db
+class TestViewBudgets:
+    """The views check their budgets in every test (see conftest); these run them on a large schedule."""
+
+    def test_get_weekly_schedule(self, authenticated_client, large_schedule):
+        assert authenticated_client.get('/weekly-schedule/').status_code == status.HTTP_200_OK
+        assert authenticated_client.get('/weekly-schedule/', {'member': 105}).status_code == status.HTTP_200_OK
+
+    def test_create_record(self, authenticated_client, large_schedule):
+        response = authenticated_client.post('/create-record/', {'day': 'monday', 'start_time': '21:00',
+                                                                 'end_time': '22:00', 'ids': [1]}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_create_overlapping_record(self, authenticated_client, large_schedule):
+        response = authenticated_client.post('/create-record/', {'day': 'monday', 'start_time': '10:10',
+                                                                 'end_time': '10:30', 'ids': [1]}, format='json')
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_update_record(self, authenticated_client, large_schedule):
+        record = large_schedule[-1]
+        response = authenticated_client.patch(f'/update-record/?record_id={record.id}', {'end_time': '20:30'})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_update_overlapping_record(self, authenticated_client, large_schedule):
+        record = large_schedule[0]
+        response = authenticated_client.patch(f'/update-record/?record_id={record.id}', {'end_time': '00:30'})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_delete_record(self, authenticated_client, large_schedule):
+        response = authenticated_client.delete(f'/delete-record/?record_id={large_schedule[0].id}')
+        assert response.status_code == status.HTTP_200_OK
@@ -0,0 +1,115 @@
+import msgpack
+import numpy
+import pytest
+import uuid
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from io import BytesIO
+from rest_framework import status
+from rest_framework.exceptions import ErrorDetail, ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.utils.serializer_helpers import ReturnDict
+from django.contrib.auth.models import User
+from manage_schedule.models import Schedule
+from manage_schedule.parsers import FastJSONParser, MessagePackParser
+from manage_schedule.renderers import FastJSONRenderer, MessagePackRenderer
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1]),
+        Schedule.objects.create(day='tuesday', start_time=time(14, 0), end_time=time(15, 0), ids=[2, 3]),
+    ]
+
+
+@pytest.mark.parametrize('data', [
+    {'schedule': {'monday': [{'record_id': 1, 'start': '09:00', 'stop': '10:00', 'ids': [1, 2]}]}},
+    {'density': {'monday': [0.0, 0.333, 1.0]}, 'bucket': 15},
+    {'created_at': datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+     'local': datetime(2024, 5, 1, 12, 30), 'day': date(2024, 5, 1), 'time': time(9, 15, 0, 5000),
+     'duration': timedelta(minutes=90), 'price': Decimal('1.50'), 'uuid': uuid.UUID(int=7)},
+    ReturnDict({'start_time': [ErrorDetail('Enter a valid time.', code='invalid')]}, serializer=None),
+    ['Zürich', 'line \u2028 paragraph \u2029', 'emoji \U0001F600', '"quoted" \\ slash'],
+    {1: 'integer key'},
+    {'array': numpy.arange(3), 'scalar': numpy.int64(5)},
+    'The record was deleted successfully!',
+    [],
+])
+def test_json_renderer_is_byte_compatible(data):
+    assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+def test_json_renderer_indent_falls_back():
+    data = {'a': [1, 2]}
+    assert FastJSONRenderer().render(data, 'application/json; indent=4') == \
+        JSONRenderer().render(data, 'application/json; indent=4')
+    assert FastJSONRenderer().render(None) == b''
+
+
+def test_json_parser():
+    assert FastJSONParser().parse(BytesIO('{"ids": [1, 2], "day": "mönday"}'.encode())) == \
+        {'ids': [1, 2], 'day': 'mönday'}
+
+    with pytest.raises(ParseError, match='JSON parse error'):
+        FastJSONParser().parse(BytesIO(b'{"ids": [1, 2]'))
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(BytesIO(b'{"value": NaN}'))
+
+
+def test_msgpack_round_trip():
+    data = {'start_time': time(9, 0), 'ids': [1, 2], 'created_at': datetime(2024, 5, 1, tzinfo=timezone.utc)}
+    content = MessagePackRenderer().render(data)
+
+    assert MessagePackParser().parse(BytesIO(content)) == {
+        'start_time': '09:00:00', 'ids': [1, 2], 'created_at': '2024-05-01T00:00:00Z'}
+
+    with pytest.raises(ParseError, match='MessagePack parse error'):
+        MessagePackParser().parse(BytesIO(content[:-3]))
+
+
+@pytest.mark.django_db
+class TestContentNegotiation:
+    def test_json_unchanged(self, authenticated_client, sample_schedule):
+        response = authenticated_client.get('/weekly-schedule/')
+
+        assert response['Content-Type'] == 'application/json'
+        assert response.content == (b'{"schedule":{"monday":[{"record_id":%d,"start":"09:00","stop":"10:00","ids":[1]}],'
+                                    b'"tuesday":[{"record_id":%d,"start":"14:00","stop":"15:00","ids":[2,3]}]}}'
+                                    % (sample_schedule[0].id, sample_schedule[1].id))
+
+    def test_msgpack(self, authenticated_client, sample_schedule):
+        json_response = authenticated_client.get('/weekly-schedule/')
+        response = authenticated_client.get('/weekly-schedule/', HTTP_ACCEPT='application/msgpack')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'application/msgpack'
+        assert msgpack.unpackb(response.content) == json_response.json()
+
+    def test_msgpack_request(self, authenticated_client):
+        body = msgpack.packb({'day': 'friday', 'start_time': '12:00', 'end_time': '13:00', 'ids': [4]})
+        response = authenticated_client.post('/create-record/', body, content_type='application/msgpack',
+                                             HTTP_ACCEPT='application/msgpack')
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert msgpack.unpackb(response.content) == 'New record was added successfully!'
+        assert Schedule.objects.filter(day='friday', ids=[4]).exists()
+
+    def test_invalid_json_request(self, authenticated_client):
+        response = authenticated_client.post('/create-record/', b'{"day": ', content_type='application/json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.json()['detail'].startswith('JSON parse error')
@@ -0,0 +1,141 @@
+import pytest
+import time as timer
+from datetime import time
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.db import connections
+from manage_schedule import routers
+from manage_schedule.models import Schedule
+from manage_schedule.routers import replica_set
+
+# Not wrapped in a transaction: reads inside one stay on the primary.
+databases = pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def other_client():
+    client = APIClient()
+    client.force_authenticate(user=User.objects.create_user(username='other12345', password='testpass123'))
+    return client
+
+
+@pytest.fixture(autouse=True)
+def read_replicas(settings):
+    """The `replica` test database stands in for a replica; it holds different records than the primary."""
+    settings.SCHEDULE_READ_REPLICAS = ['replica']
+    replica_set.health.clear()
+    yield
+    replica_set.health.clear()
+
+
+@pytest.fixture
+def primary_and_replica():
+    Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1])
+    Schedule.objects.using('replica').create(day='friday', start_time=time(12, 0), end_time=time(13, 0), ids=[2])
+
+
+@databases
+class TestReplicaReads:
+    def test_weekly_schedule(self, authenticated_client, primary_and_replica):
+        response = authenticated_client.get('/weekly-schedule/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert list(response.data['schedule']) == ['friday']
+
+    def test_weekly_schedule_stream(self, authenticated_client, primary_and_replica):
+        response = authenticated_client.get('/weekly-schedule/', {'stream': 1})
+
+        assert b'"friday"' in b''.join(response.streaming_content)
+
+    def test_availability(self, authenticated_client, primary_and_replica):
+        response = authenticated_client.get('/availability/', {'day': 'friday'})
+
+        assert response.data['availability']['friday'][0] == {'start': '00:00', 'stop': '12:00'}
+
+    def test_export(self, authenticated_client, primary_and_replica):
+        response = authenticated_client.get('/weekly-schedule/export/', {'format': 'ndjson'})
+
+        content = b''.join(response.streaming_content)
+        assert b'"friday"' in content and b'"monday"' not in content
+
+    def test_without_replicas(self, authenticated_client, primary_and_replica, settings):
+        settings.SCHEDULE_READ_REPLICAS = []
+
+        assert list(authenticated_client.get('/weekly-schedule/').data['schedule']) == ['monday']
+
+    def test_other_views_read_from_primary(self, authenticated_client, primary_and_replica):
+        response = authenticated_client.get('/weekly-schedule/changes/')
+        assert response.status_code == status.HTTP_200_OK
+
+        record = Schedule.objects.get()
+        response = authenticated_client.patch(f'/update-record/?record_id={record.id}', {'end_time': '11:00'})
+        assert response.status_code == status.HTTP_200_OK
+
+    def test_lagging_replica_is_skipped(self, authenticated_client, primary_and_replica, monkeypatch):
+        monkeypatch.setattr(routers, 'REPLICA_LAG_SQL', 'SELECT 60.0')
+
+        assert list(authenticated_client.get('/weekly-schedule/').data['schedule']) == ['monday']
+
+
+@databases
+class TestReadYourWrites:
+    def create(self, client):
+        response = client.post('/create-record/', {'day': 'sunday', 'start_time': '08:00', 'end_time': '09:00',
+                                                   'ids': [3]}, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+
+    def test_write_goes_to_primary(self, authenticated_client, primary_and_replica):
+        self.create(authenticated_client)
+
+        assert Schedule.objects.filter(day='sunday').exists()
+        assert not Schedule.objects.using('replica').filter(day='sunday').exists()
+
+    def test_writer_reads_from_primary(self, authenticated_client, other_client, primary_and_replica):
+        self.create(authenticated_client)
+
+        assert list(other_client.get('/weekly-schedule/').data['schedule']) == ['friday']
+        # The payload the other user got from the replica is not served to the writer either.
+        assert list(authenticated_client.get('/weekly-schedule/').data['schedule']) == ['monday', 'sunday']
+
+    def test_pin_expires(self, authenticated_client, primary_and_replica, settings):
+        settings.SCHEDULE_REPLICA_MAX_LAG = 0.1
+        self.create(authenticated_client)
+        timer.sleep(0.2)
+
+        assert list(authenticated_client.get('/weekly-schedule/').data['schedule']) == ['friday']
+
+
+@databases
+class TestReplicaSet:
+    def test_round_robin_over_healthy_replicas(self, settings):
+        settings.SCHEDULE_READ_REPLICAS = ['first', 'second', 'third']
+        now = timer.monotonic()
+        replica_set.health.update({'first': (now, True), 'second': (now, False), 'third': (now, True)})
+
+        chosen = {replica_set.choose() for _ in range(6)}
+
+        assert chosen == {'first', 'third'}
+
+    def test_no_healthy_replica(self, settings):
+        settings.SCHEDULE_READ_REPLICAS = ['first']
+        replica_set.health['first'] = (timer.monotonic(), False)
+
+        assert replica_set.choose() is None
+
+    def test_checked_once_per_interval(self, django_assert_num_queries):
+        with django_assert_num_queries(1, connection=connections['replica']):
+            assert replica_set.choose() == 'replica'
+            assert replica_set.choose() == 'replica'
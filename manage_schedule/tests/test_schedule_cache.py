@@ -0,0 +1,110 @@
+import pytest
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from datetime import time
+from manage_schedule.models import Schedule
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return Schedule.objects.create(
+        day='monday',
+        start_time=time(9, 0),
+        end_time=time(10, 0),
+        ids=[1]
+    )
+
+
+@pytest.mark.django_db
+class TestScheduleCache:
+    url = '/weekly-schedule/'
+
+    def test_cached_read(self, authenticated_client, sample_schedule, django_assert_num_queries):
+        """Test that a repeated read is served from the cache"""
+        first = authenticated_client.get(self.url)
+
+        with django_assert_num_queries(0):
+            second = authenticated_client.get(self.url)
+
+        assert second.data == first.data
+        assert second['ETag'] == first['ETag']
+
+    def test_not_modified(self, authenticated_client, sample_schedule, django_assert_num_queries):
+        etag = authenticated_client.get(self.url)['ETag']
+
+        with django_assert_num_queries(0):
+            response = authenticated_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response['ETag'] == etag
+
+    def test_write_invalidates(self, authenticated_client, sample_schedule, django_capture_on_commit_callbacks):
+        """Test that create, update and delete change the ETag and the cached payload"""
+        etags = [authenticated_client.get(self.url)['ETag']]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            data = {'day': 'tuesday', 'start_time': '09:00', 'end_time': '10:00', 'ids': [2]}
+            authenticated_client.post('/create-record/', data=data, format='json')
+        response = authenticated_client.get(self.url)
+        etags.append(response['ETag'])
+        assert 'tuesday' in response.data['schedule']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.patch(f"/update-record/?record_id={sample_schedule.id}", data={'end_time': '11:00'})
+        response = authenticated_client.get(self.url)
+        etags.append(response['ETag'])
+        assert response.data['schedule']['monday'][0]['stop'] == '11:00'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.delete(f"/delete-record/?record_id={sample_schedule.id}")
+        response = authenticated_client.get(self.url)
+        etags.append(response['ETag'])
+        assert 'monday' not in response.data['schedule']
+
+        assert len(set(etags)) == 4
+
+    def test_stale_etag(self, authenticated_client, sample_schedule, django_capture_on_commit_callbacks):
+        etag = authenticated_client.get(self.url)['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            authenticated_client.delete(f"/delete-record/?record_id={sample_schedule.id}")
+        response = authenticated_client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {'schedule': {}}
+
+    def test_failed_write_keeps_cache(self, authenticated_client, sample_schedule, django_capture_on_commit_callbacks):
+        etag = authenticated_client.get(self.url)['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            data = {'day': 'monday', 'start_time': '09:30', 'end_time': '10:30', 'ids': [2]}
+            authenticated_client.post('/create-record/', data=data, format='json')
+
+        assert authenticated_client.get(self.url)['ETag'] == etag
+
+    def test_admin_save_invalidates(self, client, sample_schedule, django_capture_on_commit_callbacks):
+        User.objects.create_superuser(username='admin12345', password='testpass123')
+        client.login(username='admin12345', password='testpass123')
+        api_client = APIClient()
+        api_client.force_authenticate(user=User.objects.get(username='admin12345'))
+        etag = api_client.get(self.url)['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            data = {'day': 'monday', 'start_time': '11:00', 'end_time': '12:00', 'ids': '[3]'}
+            response = client.post(f'/admin/manage_schedule/schedule/{sample_schedule.id}/change/', data=data)
+
+        assert response.status_code == 302
+        assert api_client.get(self.url)['ETag'] != etag
@@ -0,0 +1,134 @@
+import pytest
+from datetime import time, timedelta
+from io import StringIO
+from rest_framework import status
+from rest_framework.test import APIClient
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.utils import timezone
+from manage_schedule.models import Schedule, ScheduleChange
+
+
+@pytest.fixture
+def api_client():
+    return APIClient()
+
+
+@pytest.fixture
+def authenticated_client(api_client):
+    user = User.objects.create_user(username='tester12345', password='testpass123')
+    api_client.force_authenticate(user=user)
+    return api_client
+
+
+@pytest.fixture
+def sample_schedule():
+    return Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1])
+
+
+@pytest.mark.django_db
+class TestGetScheduleChanges:
+    url = '/weekly-schedule/changes/'
+
+    def get_last_seq(self, client):
+        return client.get(self.url).data['last_seq']
+
+    def test_create_update_delete(self, authenticated_client, sample_schedule):
+        since = self.get_last_seq(authenticated_client)
+
+        authenticated_client.post('/create-record/', {'day': 'friday', 'start_time': '12:00', 'end_time': '13:00',
+                                                       'ids': [2]}, format='json')
+        record = Schedule.objects.get(day='friday')
+        authenticated_client.patch(f'/update-record/?record_id={record.id}', {'end_time': '14:00'})
+        authenticated_client.delete(f'/delete-record/?record_id={record.id}')
+
+        response = authenticated_client.get(self.url, {'since': since})
+
+        assert response.status_code == status.HTTP_200_OK
+        changes = response.data['changes']
+        assert [(change['op'], change['record_id']) for change in changes] == [
+            ('create', record.id), ('update', record.id), ('delete', record.id)]
+        assert changes[0]['before'] is None
+        assert changes[1]['before']['end_time'] == '13:00:00' and changes[1]['after']['end_time'] == '14:00:00'
+        assert changes[2]['before'] == {'day': 'friday', 'start_time': '12:00:00', 'end_time': '14:00:00',
+                                        'ids': [2]}
+        assert changes[0]['seq'] < changes[1]['seq'] < changes[2]['seq'] == response.data['last_seq']
+        assert not response.data['has_more']
+
+    def test_nothing_changed(self, authenticated_client, sample_schedule):
+        since = self.get_last_seq(authenticated_client)
+
+        response = authenticated_client.get(self.url, {'since': since})
+
+        assert response.data == {'changes': [], 'last_seq': since, 'has_more': False}
+
+    def test_failed_write_is_not_logged(self, authenticated_client, sample_schedule):
+        since = self.get_last_seq(authenticated_client)
+
+        authenticated_client.post('/create-record/', {'day': 'monday', 'start_time': '09:30', 'end_time': '11:00',
+                                                      'ids': [2]}, format='json')
+
+        assert authenticated_client.get(self.url, {'since': since}).data['changes'] == []
+
+    def test_bulk_writes(self, authenticated_client, sample_schedule):
+        since = self.get_last_seq(authenticated_client)
+        data = [{'day': 'sunday', 'start_time': f'{hour:02d}:00', 'end_time': f'{hour:02d}:30', 'ids': [hour]}
+                for hour in range(3)]
+
+        created = authenticated_client.post('/create-records/bulk/', data=data, format='json').data['created']
+        authenticated_client.delete('/delete-records/bulk/', data={'record_ids': created}, format='json')
+
+        changes = authenticated_client.get(self.url, {'since': since}).data['changes']
+        assert [change['op'] for change in changes] == ['create'] * 3 + ['delete'] * 3
+        assert sorted(change['record_id'] for change in changes[3:]) == created
+
+    def test_pagination(self, authenticated_client):
+        since = self.get_last_seq(authenticated_client)
+        for hour in range(3):
+            authenticated_client.post('/create-record/', {'day': 'sunday', 'start_time': f'{hour:02d}:00',
+                                                          'end_time': f'{hour:02d}:30', 'ids': [1]}, format='json')
+
+        first = authenticated_client.get(self.url, {'since': since, 'limit': 2}).data
+        second = authenticated_client.get(self.url, {'since': first['last_seq'], 'limit': 2}).data
+
+        assert len(first['changes']) == 2 and first['has_more']
+        assert len(second['changes']) == 1 and not second['has_more']
+
+    def test_resync_after_reset(self, authenticated_client, sample_schedule, tmp_path):
+        since = self.get_last_seq(authenticated_client)
+        path = tmp_path / 'schedule.csv'
+        path.write_text('day,start_time,end_time,ids\nsaturday,09:00,10:00,[1]\n')
+        call_command('import_schedule', str(path), stdout=StringIO())
+
+        response = authenticated_client.get(self.url, {'since': since})
+
+        assert response.status_code == status.HTTP_410_GONE
+        assert response.data['resync'] is True
+        assert authenticated_client.get(self.url, {'since': response.data['last_seq']}).status_code == 200
+
+    def test_resync_after_compaction(self, authenticated_client, sample_schedule):
+        since = self.get_last_seq(authenticated_client)
+        authenticated_client.delete(f'/delete-record/?record_id={sample_schedule.id}')
+        ScheduleChange.objects.update(created_at=timezone.now() - timedelta(days=8))
+        latest = Schedule.objects.create(day='sunday', start_time=time(9, 0), end_time=time(10, 0), ids=[1])
+        authenticated_client.delete(f'/delete-record/?record_id={latest.id}')
+
+        call_command('compact_schedule_changes', '--days', '7', stdout=StringIO())
+
+        assert authenticated_client.get(self.url, {'since': since}).status_code == status.HTTP_410_GONE
+        reset = ScheduleChange.objects.order_by('seq').first()
+        assert reset.op == ScheduleChange.RESET
+        response = authenticated_client.get(self.url, {'since': reset.seq})
+        assert [change['op'] for change in response.data['changes']] == ['delete']
+
+    def test_future_sequence(self, authenticated_client):
+        response = authenticated_client.get(self.url, {'since': 10 ** 9})
+
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_invalid_parameters(self, authenticated_client):
+        assert authenticated_client.get(self.url, {'since': 'x'}).status_code == status.HTTP_400_BAD_REQUEST
+        assert authenticated_client.get(self.url, {'limit': 0}).status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_unauthenticated_request(self, api_client):
+        assert api_client.get(self.url).status_code == status.HTTP_401_UNAUTHORIZED
@@ -0,0 +1,139 @@
+import asyncio
+import pytest
+from asgiref.sync import async_to_sync, sync_to_async
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from datetime import time
+from manage_schedule.events import (OVERFLOW, Broadcaster, InMemoryBackend, PostgresBackend, format_event,
+                                    reset_event)
+from manage_schedule.models import Schedule, ScheduleChange
+
+
+@pytest.fixture
+def user():
+    return User.objects.create_user(username='tester12345', password='testpass123')
+
+
+@pytest.fixture
+def authorization(user):
+    return {'Authorization': f'Bearer {AccessToken.for_user(user)}'}
+
+
+@pytest.fixture
+def create_record(user, django_capture_on_commit_callbacks):
+    """Create a record through the API and run the on-commit callbacks, which publish the events."""
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    def create(hour):
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post('/create-record/', {'day': 'monday', 'start_time': f'{hour:02d}:00',
+                                            'end_time': f'{hour:02d}:30', 'ids': [1]}, format='json')
+        return ScheduleChange.objects.latest('seq')
+
+    return create
+
+
+async def read_events(stream, count):
+    return [(await asyncio.wait_for(anext(stream), 5)).decode() for _ in range(count)]
+
+
+@pytest.mark.django_db
+class TestScheduleEvents:
+    url = '/weekly-schedule/events/'
+
+    def test_live_events(self, authorization, create_record):
+        @async_to_sync
+        async def scenario():
+            response = await AsyncClient().get(self.url, headers=authorization)
+            stream = response.streaming_content
+            assert await read_events(stream, 1) == ['retry: 3000\n\n']
+
+            change = await sync_to_async(create_record)(9)
+            events = await read_events(stream, 1)
+            await stream.aclose()
+            return response, change, events
+
+        response, change, events = scenario()
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response['Content-Type'] == 'text/event-stream'
+        assert events[0].startswith(f'id: {change.seq}\nevent: create\ndata: {{"seq":{change.seq},"op":"create"')
+        assert '"after":{"day":"monday","start_time":"09:00:00","end_time":"09:30:00","ids":[1]}' in events[0]
+
+    def test_replay_from_last_event_id(self, authorization, create_record):
+        first = create_record(9)
+        second = create_record(10)
+
+        @async_to_sync
+        async def scenario():
+            response = await AsyncClient().get(self.url, headers={**authorization, 'Last-Event-ID': str(first.seq)})
+            events = await read_events(response.streaming_content, 2)
+            await response.streaming_content.aclose()
+            return events
+
+        assert scenario()[1].startswith(f'id: {second.seq}\nevent: create\n')
+
+    def test_resync_when_log_was_reset(self, authorization, create_record):
+        first = create_record(9)
+        ScheduleChange.objects.create(op=ScheduleChange.RESET)
+
+        @async_to_sync
+        async def scenario():
+            response = await AsyncClient().get(self.url, headers={**authorization, 'Last-Event-ID': str(first.seq)})
+            return [chunk.decode() async for chunk in response.streaming_content]
+
+        assert scenario() == ['retry: 3000\n\n', format_event(reset_event())]
+
+    def test_unauthenticated_request(self):
+        response = async_to_sync(AsyncClient().get)(self.url, headers={'Accept': 'text/event-stream'})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+        assert response['Content-Type'] == 'application/json'
+
+
+class TestBroadcaster:
+    def test_slow_subscriber_overflows(self):
+        @async_to_sync
+        async def scenario():
+            broadcaster = Broadcaster(InMemoryBackend(), queue_size=2)
+            fast, slow = broadcaster.subscribe(), broadcaster.subscribe()
+
+            broadcaster.publish([reset_event(1)])
+            await asyncio.sleep(0)
+            received = await fast.get(timeout=1)
+            broadcaster.publish([reset_event(2), reset_event(3)])
+            await asyncio.sleep(0)
+            return received, await fast.get(timeout=1), await slow.get(timeout=1), slow.queue.qsize()
+
+        received, fast_next, slow_next, slow_backlog = scenario()
+
+        assert received['seq'] == 1 and fast_next['seq'] == 2
+        assert slow_next is OVERFLOW and slow_backlog == 0
+
+    def test_heartbeat_timeout(self):
+        @async_to_sync
+        async def scenario():
+            return await Broadcaster(InMemoryBackend(), queue_size=2).subscribe().get(timeout=0.01)
+
+        assert scenario() is None
+
+    @pytest.mark.django_db
+    def test_postgres_backend_splits_payloads(self):
+        events = [{'seq': seq, 'op': 'create', 'record_id': seq, 'before': None, 'after': {'ids': list(range(300))}}
+                  for seq in range(10)]
+        events.append({'seq': 10, 'op': 'create', 'record_id': 10, 'before': None,
+                       'after': {'ids': list(range(3000))}})
+
+        with CaptureQueriesContext(connection) as queries:
+            PostgresBackend().publish(events)
+
+        notifications = [query['sql'] for query in queries if 'pg_notify' in query['sql']]
+        assert len(notifications) > 1
+        assert all(len(sql) < 8100 for sql in notifications)
+        assert '"op": "reset"' in notifications[-1]
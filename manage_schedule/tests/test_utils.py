@@ -0,0 +1,71 @@
+import pytest
+from datetime import time
+from manage_schedule.models import Schedule
+from manage_schedule.utils import (is_time_overlap, find_conflicting_ids, has_time_conflict, find_free_intervals,
+                                   format_day_time, parse_day_time)
+
+
+@pytest.fixture
+def sample_schedule():
+    return [
+        Schedule.objects.create(day='monday', start_time=time(9, 0), end_time=time(10, 0), ids=[1]),
+        Schedule.objects.create(day='monday', start_time=time(11, 0), end_time=time(12, 0), ids=[2]),
+        Schedule.objects.create(day='tuesday', start_time=time(9, 0), end_time=time(10, 0), ids=[3]),
+    ]
+
+
+class TestIsTimeOverlap:
+    def test_overlapping_intervals(self):
+        assert is_time_overlap(time(9, 30), time(10, 30), time(9, 0), time(10, 0))
+
+    def test_touching_intervals_do_not_overlap(self):
+        assert not is_time_overlap(time(10, 0), time(11, 0), time(9, 0), time(10, 0))
+
+
+class TestFindFreeIntervals:
+    def test_gaps_inside_window(self):
+        busy = [(0, 100), (150, 200), (200, 300), (500, 900)]
+
+        assert find_free_intervals(busy, 50, 600) == [(100, 150), (300, 500)]
+
+    def test_min_duration(self):
+        assert find_free_intervals([(150, 200)], 100, 400, min_duration=100) == [(200, 400)]
+
+    def test_empty_day(self):
+        assert find_free_intervals([], 0, 86400) == [(0, 86400)]
+
+    def test_fully_busy_window(self):
+        assert find_free_intervals([(0, 1000)], 100, 200) == []
+
+    def test_day_time_format(self):
+        assert parse_day_time('24:00') == 86400
+        assert format_day_time(parse_day_time('08:05:30')) == '08:05:30'
+        assert format_day_time(parse_day_time('08:05')) == '08:05'
+
+
+@pytest.mark.django_db
+class TestConflictFinder:
+    def test_find_conflicting_ids(self, sample_schedule):
+        """Test that every overlapping record of the same day is returned in start order"""
+        first, second, _ = sample_schedule
+
+        assert find_conflicting_ids('monday', time(9, 30), time(11, 30)) == [first.id, second.id]
+
+    def test_touching_intervals_are_not_conflicts(self, sample_schedule):
+        """Test that the query follows the semantics of is_time_overlap"""
+        assert find_conflicting_ids('monday', time(10, 0), time(11, 0)) == []
+        assert not has_time_conflict('monday', time(10, 0), time(11, 0))
+
+    def test_other_days_are_ignored(self, sample_schedule):
+        assert not has_time_conflict('wednesday', time(9, 0), time(10, 0))
+
+    def test_exclude_record(self, sample_schedule):
+        """Test that the record being edited is not reported as a conflict with itself"""
+        first = sample_schedule[0]
+
+        assert not has_time_conflict('monday', time(9, 15), time(9, 45), exclude_id=first.id)
+        assert has_time_conflict('monday', time(9, 15), time(9, 45))
+
+    def test_single_query(self, sample_schedule, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            has_time_conflict('monday', time(9, 30), time(10, 30))
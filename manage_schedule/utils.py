@@ -1,6 +1,157 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import time
+from django.db.models import Max
+from .models import Schedule, ScheduleChange
+
+
 def is_time_overlap(new_start, new_end, existing_start, existing_end):
     """
     Check for intersection of time intervals. If the new interval (new_start, new_end) intersects with an existing
     interval (existing_start, existing_end), we return True.
     """
     return max(new_start, existing_start) < min(new_end, existing_end)
+
+
+def overlapping_records(day, start, end, exclude_id=None):
+    """
+    Return a queryset of records of the given day that overlap the interval (start, end). The filter mirrors
+    `is_time_overlap` (touching intervals do not overlap) and is served by the (day, start_time, end_time) index.
+    """
+    queryset = Schedule.objects.filter(day=day, start_time__lt=end, end_time__gt=start)
+
+    if exclude_id is not None:
+        queryset = queryset.exclude(id=exclude_id)
+
+    return queryset
+
+
+def find_conflicting_ids(day, start, end, exclude_id=None):
+    """
+    Return the IDs of the records which overlap the interval (start, end) on the given day.
+    """
+    return list(overlapping_records(day, start, end, exclude_id).order_by('start_time').values_list('id', flat=True))
+
+
+def has_time_conflict(day, start, end, exclude_id=None):
+    """
+    Check with a single EXISTS query whether the interval (start, end) overlaps any record of the given day.
+    """
+    return overlapping_records(day, start, end, exclude_id).exists()
+
+
+def find_batch_conflicts(intervals, exclude_ids=()):
+    """
+    Find the intervals of a batch which can not be stored. `intervals` is a list of (day, start, end) tuples; the
+    positions of the rejected ones are returned.
+
+    Stored records of the affected days are loaded with one ordered query, then every day is swept once in start
+    order. An interval is rejected when it overlaps a stored record (records listed in `exclude_ids` are ignored, they
+    are the ones being moved) or an interval of the batch that was already accepted.
+    """
+    batch_by_day = defaultdict(list)
+    for position, (day, start, end) in enumerate(intervals):
+        batch_by_day[day].append((start, position, end))
+
+    stored_starts = defaultdict(list)
+    stored_ends = defaultdict(list)
+    stored = (Schedule.objects.filter(day__in=list(batch_by_day)).exclude(id__in=exclude_ids)
+              .order_by('day', 'start_time').values_list('day', 'start_time', 'end_time'))
+    for day, start, end in stored:
+        stored_starts[day].append(start)
+        stored_ends[day].append(end)
+
+    conflicts = set()
+    for day, batch in batch_by_day.items():
+        starts, ends = stored_starts[day], stored_ends[day]
+        accepted_end = None
+
+        for start, position, end in sorted(batch):
+            # Stored records never overlap each other, so the last one starting before `end` is the only candidate.
+            candidate = bisect_left(starts, end) - 1
+            if candidate >= 0 and is_time_overlap(start, end, starts[candidate], ends[candidate]):
+                conflicts.add(position)
+            elif accepted_end is not None and start < accepted_end:
+                conflicts.add(position)
+            else:
+                accepted_end = end
+
+    return conflicts
+
+
+DAY_SECONDS = 24 * 60 * 60
+
+
+def time_to_seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def parse_day_time(value):
+    """
+    Parse 'HH:MM' or 'HH:MM:SS' into seconds since midnight. '24:00' denotes the end of the day.
+    """
+    if value in ('24:00', '24:00:00'):
+        return DAY_SECONDS
+    return time_to_seconds(time.fromisoformat(value))
+
+
+def format_day_time(seconds):
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f'{hours:02d}:{minutes:02d}:{seconds:02d}' if seconds else f'{hours:02d}:{minutes:02d}'
+
+
+def find_free_intervals(busy, window_start, window_end, min_duration=0):
+    """
+    Return the gaps between the busy intervals inside the window (window_start, window_end) which last at least
+    `min_duration`. All values are seconds since midnight and `busy` must be ordered by start. Intervals are half-open
+    as in `is_time_overlap`, so touching busy intervals leave no gap between them.
+    """
+    free = []
+    cursor = window_start
+
+    for start, end in busy:
+        if start >= window_end:
+            break
+        if start > cursor and start - cursor >= min_duration:
+            free.append((cursor, start))
+        cursor = max(cursor, end)
+
+    if window_end > cursor and window_end - cursor >= min_duration:
+        free.append((cursor, window_end))
+
+    return free
+
+
+def overlap_message(start, end):
+    return f"Time interval {start} - {end} overlaps with an existing interval!"
+
+
+def is_overlap_violation(error):
+    """
+    Check whether a database error was raised by the `schedule_no_overlap` exclusion constraint, i.e. a concurrent
+    write inserted an overlapping interval after our own check passed.
+    """
+    return 'schedule_no_overlap' in str(error)
+
+
+def last_change_seq():
+    return ScheduleChange.objects.aggregate(last=Max('seq'))['last'] or 0
+
+
+def needs_resync(since, last_seq):
+    """
+    Check whether the change log can not tell what changed after the sequence number `since`: a reset entry follows
+    it (an import or a compaction), or it is not a sequence number of this log.
+    """
+    return since > last_seq or ScheduleChange.objects.filter(op=ScheduleChange.RESET, seq__gt=since).exists()
+
+
+def changes_after(since, limit):
+    """
+    Return up to `limit` change log entries (as dicts) following the sequence number `since` in sequence order, and
+    whether more follow.
+    """
+    changes = list(ScheduleChange.objects.filter(seq__gt=since).order_by('seq')
+                   .values('seq', 'op', 'record_id', 'before', 'after', 'created_at')[:limit + 1])
+    return changes[:limit], len(changes) > limit
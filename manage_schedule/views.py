@@ -1,33 +1,288 @@
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
-from .models import Schedule
-from .serializers import WeeklyScheduleSerializer, RecordSerializer, EditRecordTimelineSerializer
-from .utils import is_time_overlap
+from .cache import get_schedule_version, get_cached_payload, get_cached_payloads, schedule_changed
+from .idempotency import idempotent, IDEMPOTENCY_KEY_PARAMETER
+from .models import Schedule, ScheduleChange
+from .occupancy import occupancy, DAY_MINUTES
+from .query_budget import query_budget
+from .routers import replica_reads
+from .renderers import CSVRenderer, NDJSONRenderer, ICalendarRenderer, FastJSONRenderer
+from .serializers import (WeeklyScheduleSerializer, RecordSerializer, EditRecordTimelineSerializer,
+                          BulkEditRecordTimelineSerializer, BulkDeleteRecordsSerializer, build_weekly_schedule,
+                          stream_weekly_schedule)
+from .utils import (has_time_conflict, overlap_message, is_overlap_violation, find_batch_conflicts, time_to_seconds,
+                    parse_day_time, format_day_time, find_free_intervals, last_change_seq, needs_resync, changes_after)
+from django.db import IntegrityError, connection, transaction
+from django.http import StreamingHttpResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.utils.text import compress_sequence
 from rest_framework import status
+from rest_framework.settings import api_settings
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+# Most changes returned by one change feed request.
+CHANGES_PAGE_SIZE = 1000
+
 
 class GetWeekSchedule(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
 
     @swagger_auto_schema(
         operation_description="Get the weekly schedule",
+        manual_parameters=[
+            openapi.Parameter(
+                'stream',
+                openapi.IN_QUERY,
+                description="Stream the same JSON document from a database cursor (for large schedules)",
+                type=openapi.TYPE_BOOLEAN,
+                required=False
+            ),
+            openapi.Parameter(
+                'member',
+                openapi.IN_QUERY,
+                description="Return only the slots of the member with this ID",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            )
+        ],
         responses={200: WeeklyScheduleSerializer(many=True)},
         tags=['Schedule']
     )
+    @query_budget(1)
+    @replica_reads
+    def get(self, request):
+        slots = Schedule.objects.weekly_slots()
+        cache_name = 'weekly'
+        member = request.query_params.get('member')
+
+        if member is not None:
+            try:
+                member = int(member)
+            except ValueError:
+                return Response('Member ID must be an integer!', status=status.HTTP_400_BAD_REQUEST)
+
+            slots = slots.filter(ids__contains=[member])
+            cache_name = f'weekly:member:{member}'
+
+        if request.query_params.get('stream', '').lower() in ('1', 'true'):
+            # Routed now: the stream is read after the view has returned.
+            slots = slots.using(slots.db)
+            return StreamingHttpResponse(stream_weekly_schedule(slots.iterator(chunk_size=2000)),
+                                         content_type='application/json')
+
+        version = get_schedule_version()
+        etag = f'"{version}"'
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+        schedule = get_cached_payload(cache_name, version, lambda: build_weekly_schedule(slots))
+        return Response(schedule, status=status.HTTP_200_OK, headers={'ETag': etag})
+
+
+class JSONErrorsMixin:
+    """
+    For views streaming a format of their own: errors are still rendered as JSON, whatever format was negotiated.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if isinstance(response, Response):
+            request.accepted_renderer, request.accepted_media_type = FastJSONRenderer(), FastJSONRenderer.media_type
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class ExportSchedule(JSONErrorsMixin, APIView):
+    permission_classes = [IsAuthenticated]
+    renderer_classes = [CSVRenderer, NDJSONRenderer, ICalendarRenderer]
+
+    @swagger_auto_schema(
+        operation_description="Export the whole schedule, streamed from a database cursor. Responses are gzip "
+                              "compressed on the fly for clients which accept it.",
+        manual_parameters=[
+            openapi.Parameter(
+                'format',
+                openapi.IN_QUERY,
+                description="Export format, negotiated from the Accept header when missing (csv by default)",
+                type=openapi.TYPE_STRING,
+                enum=['csv', 'ndjson', 'ics'],
+                required=False
+            )
+        ],
+        responses={200: "One record per CSV or NDJSON line, or a weekly repeating iCalendar event per record"},
+        tags=['Schedule']
+    )
+    @replica_reads
+    def get(self, request):
+        renderer = request.accepted_renderer
+        slots = Schedule.objects.weekly_slots()
+        # Routed now: the stream is read after the view has returned.
+        slots = slots.using(slots.db).iterator(chunk_size=2000)
+
+        response = StreamingHttpResponse(renderer.stream(slots),
+                                         content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = f'attachment; filename="schedule.{renderer.format}"'
+        patch_vary_headers(response, ('Accept', 'Accept-Encoding'))
+
+        if re_accepts_gzip.search(request.headers.get('Accept-Encoding', '')):
+            response.streaming_content = compress_sequence(response.streaming_content)
+            response['Content-Encoding'] = 'gzip'
+
+        return response
+
+
+class GetScheduleChanges(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get the schedule changes made after a sequence number. Without `since` only the "
+                              "current sequence number is returned: take it, download the weekly schedule, then poll "
+                              "with it (replaying a change is harmless). 410 means the changes since `since` are no "
+                              "longer known and the weekly schedule must be downloaded again.",
+        manual_parameters=[
+            openapi.Parameter(
+                'since',
+                openapi.IN_QUERY,
+                description="Last sequence number the client has applied",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            ),
+            openapi.Parameter(
+                'limit',
+                openapi.IN_QUERY,
+                description=f"Maximum number of changes (1 - {CHANGES_PAGE_SIZE}, {CHANGES_PAGE_SIZE} by default)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            )
+        ],
+        responses={
+            200: "Changes in sequence order, the last sequence number and whether more changes follow",
+            410: "Resync required"
+        },
+        tags=['Schedule']
+    )
+    def get(self, request):
+        try:
+            since = request.query_params.get('since')
+            since = None if since is None else int(since)
+            limit = int(request.query_params.get('limit', CHANGES_PAGE_SIZE))
+        except ValueError:
+            return Response('Since and limit must be integers!', status=status.HTTP_400_BAD_REQUEST)
+
+        if not 1 <= limit <= CHANGES_PAGE_SIZE:
+            return Response(f'Limit must be between 1 and {CHANGES_PAGE_SIZE}!', status=status.HTTP_400_BAD_REQUEST)
+
+        last_seq = last_change_seq()
+
+        if since is None:
+            return Response({'changes': [], 'last_seq': last_seq, 'has_more': False}, status=status.HTTP_200_OK)
+
+        if needs_resync(since, last_seq):
+            return Response({'resync': True, 'last_seq': last_seq}, status=status.HTTP_410_GONE)
+
+        changes, has_more = changes_after(since, limit)
+
+        return Response({'changes': changes, 'last_seq': changes[-1]['seq'] if changes else since,
+                         'has_more': has_more}, status=status.HTTP_200_OK)
+
+
+class GetScheduleHeatmap(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get the occupancy density of every day per bucket of minutes",
+        manual_parameters=[
+            openapi.Parameter(
+                'bucket',
+                openapi.IN_QUERY,
+                description="Bucket length in minutes, must divide a day evenly (15 by default)",
+                type=openapi.TYPE_INTEGER,
+                required=False
+            )
+        ],
+        responses={
+            200: "Share of busy minutes (density) and average busy members (members) per bucket for each day",
+            400: "Invalid bucket length"
+        },
+        tags=['Schedule']
+    )
     def get(self, request):
-        schedule = Schedule.objects.all()
-        serialized = WeeklyScheduleSerializer(schedule)
-        return Response(serialized.data, status=status.HTTP_200_OK)
+        try:
+            bucket = int(request.query_params.get('bucket', 15))
+        except ValueError:
+            bucket = 0
+
+        if bucket <= 0 or DAY_MINUTES % bucket:
+            return Response('Bucket must be a number of minutes which divides a day evenly!',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(occupancy.synced().heatmap(bucket), status=status.HTTP_200_OK)
+
+
+class GetAvailability(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Get the free time intervals of each day",
+        manual_parameters=[
+            openapi.Parameter('day', openapi.IN_QUERY, description="Only this day (all days by default)",
+                              type=openapi.TYPE_STRING, enum=list(Schedule.DAY_INDEX), required=False),
+            openapi.Parameter('min_duration', openapi.IN_QUERY, description="Minimal length of a free interval in "
+                              "minutes", type=openapi.TYPE_INTEGER, required=False),
+            openapi.Parameter('from', openapi.IN_QUERY, description="Start of the searched window, HH:MM",
+                              type=openapi.TYPE_STRING, required=False),
+            openapi.Parameter('to', openapi.IN_QUERY, description="End of the searched window, HH:MM (24:00 by "
+                              "default)", type=openapi.TYPE_STRING, required=False),
+        ],
+        responses={
+            200: "Free intervals for each requested day",
+            400: "Invalid query parameters"
+        },
+        tags=['Schedule']
+    )
+    @replica_reads
+    def get(self, request):
+        day = request.query_params.get('day')
+
+        if day is not None and day not in Schedule.DAY_INDEX:
+            return Response(f"Day must be one of: {', '.join(Schedule.DAY_INDEX)}!", status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            min_duration = int(request.query_params.get('min_duration', 0)) * 60
+            window_start = parse_day_time(request.query_params.get('from', '00:00'))
+            window_end = parse_day_time(request.query_params.get('to', '24:00'))
+        except ValueError:
+            return Response('Enter min_duration in minutes and from/to in HH:MM format!',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if min_duration < 0 or window_start >= window_end:
+            return Response('The window must end after it starts and min_duration must not be negative!',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        def busy_intervals(days):
+            busy = {day: [] for day in days}
+            slots = (Schedule.objects.filter(day__in=days).order_by('day_index', 'start_time')
+                     .values_list('day', 'start_time', 'end_time'))
+            for slot_day, start_time, end_time in slots:
+                busy[slot_day].append((time_to_seconds(start_time), time_to_seconds(end_time)))
+            return busy
+
+        days = [day] if day else list(Schedule.DAY_INDEX)
+        busy = get_cached_payloads('busy', days, get_schedule_version(), busy_intervals)
+
+        availability = {
+            day: [{"start": format_day_time(start), "stop": format_day_time(end)}
+                  for start, end in find_free_intervals(busy[day], window_start, window_end, min_duration)]
+            for day in days
+        }
+        return Response({"availability": availability}, status=status.HTTP_200_OK)
 
 
 class CreateRecord(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
 
     def get(self, request):
         data_format_example = {
@@ -38,6 +293,16 @@ class CreateRecord(APIView):
         }
         return Response(data_format_example, status=status.HTTP_200_OK)
 
+    @swagger_auto_schema(
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER],
+        request_body=RecordSerializer,
+        responses={
+            201: "New record was added successfully!",
+            400: "Validation errors or overlapping time intervals"
+        }
+    )
+    @idempotent
+    @query_budget(5)
     def post(self, request):
         user_data = request.data
         serializer = RecordSerializer(data=user_data)
@@ -47,23 +312,93 @@ class CreateRecord(APIView):
             new_start = serializer.validated_data['start_time']
             new_end = serializer.validated_data['end_time']
 
-            existing_intervals = Schedule.objects.filter(day=day)
+            # A free interval in an up-to-date occupancy map needs no query, the exclusion constraint covers races.
+            if not occupancy.is_free(day, new_start, new_end) and has_time_conflict(day, new_start, new_end):
+                return Response(overlap_message(new_start, new_end), status=status.HTTP_400_BAD_REQUEST)
 
-            for existing in existing_intervals:
-                if is_time_overlap(new_start, new_end, existing.start_time, existing.end_time):
-                    return Response(f"Time interval {new_start} - {new_end} overlaps with an existing interval!",
-                                    status=status.HTTP_400_BAD_REQUEST)
-
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    record = serializer.save()
+                    schedule_changed(added=[record.slot], changes=[ScheduleChange.created(record)])
+            except IntegrityError as error:
+                if not is_overlap_violation(error):
+                    raise
+                return Response(overlap_message(new_start, new_end), status=status.HTTP_400_BAD_REQUEST)
 
             return Response('New record was added successfully!', status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class BulkCreateRecords(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Create many records at once. With atomic=false the valid records are created and "
+                              "the rejected ones are reported per item, otherwise nothing is created on any error.",
+        manual_parameters=[
+            openapi.Parameter(
+                'atomic',
+                openapi.IN_QUERY,
+                description="Create nothing if any record is rejected (default true)",
+                type=openapi.TYPE_BOOLEAN,
+                required=False
+            ),
+            IDEMPOTENCY_KEY_PARAMETER
+        ],
+        request_body=RecordSerializer(many=True),
+        responses={
+            201: "IDs of the created records and errors of the rejected ones",
+            400: "Validation errors or overlapping time intervals"
+        }
+    )
+    @idempotent
+    def post(self, request):
+        if not isinstance(request.data, list):
+            return Response('Expected a list of records!', status=status.HTTP_400_BAD_REQUEST)
+
+        atomic = request.query_params.get('atomic', 'true').lower() not in ('false', '0')
+
+        record_serializers = [RecordSerializer(data=item) for item in request.data]
+        errors = {position: serializer.errors
+                  for position, serializer in enumerate(record_serializers) if not serializer.is_valid()}
+
+        valid = [position for position in range(len(record_serializers)) if position not in errors]
+        intervals = [(record_serializers[position].validated_data['day'],
+                      record_serializers[position].validated_data['start_time'],
+                      record_serializers[position].validated_data['end_time']) for position in valid]
+
+        for conflict in find_batch_conflicts(intervals):
+            _, start, end = intervals[conflict]
+            errors[valid[conflict]] = {api_settings.NON_FIELD_ERRORS_KEY: [overlap_message(start, end)]}
+
+        error_list = [{'index': position, 'errors': errors[position]} for position in sorted(errors)]
+        accepted = [position for position in valid if position not in errors]
+
+        if not accepted or (atomic and errors):
+            return Response({'created': [], 'errors': error_list}, status=status.HTTP_400_BAD_REQUEST)
+
+        records = [Schedule(**record_serializers[position].validated_data) for position in accepted]
+        for record in records:
+            record.day_index = Schedule.DAY_INDEX[record.day]
+
+        try:
+            with transaction.atomic():
+                Schedule.objects.bulk_create(records)
+                schedule_changed(added=[record.slot for record in records],
+                                 changes=[ScheduleChange.created(record) for record in records])
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            return Response('Time intervals overlap with intervals created concurrently! Repeat the request.',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({'created': [record.id for record in records], 'errors': error_list},
+                        status=status.HTTP_201_CREATED)
+
+
 class DeleteRecord(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
 
     @swagger_auto_schema(
         operation_description="Delete a record by its ID",
@@ -82,6 +417,7 @@ class DeleteRecord(APIView):
             404: "This record already deleted or record with those timeline does not exist!"
         }
     )
+    @query_budget(4)
     def delete(self, request):
         record_id = request.query_params.get('record_id')
 
@@ -91,8 +427,11 @@ class DeleteRecord(APIView):
 
         try:
             record = Schedule.objects.get(id=record_id)
+            change = ScheduleChange.deleted(record)
 
-            record.delete()
+            with transaction.atomic():
+                record.delete()
+                schedule_changed(removed=[record.slot], changes=[change])
 
             return Response('The record was deleted successfully!',
                             status=status.HTTP_200_OK)
@@ -104,7 +443,6 @@ class DeleteRecord(APIView):
 
 class UpdateRecord(APIView):
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
 
     @swagger_auto_schema(
         operation_description="Update a record by its ID and new data",
@@ -124,6 +462,7 @@ class UpdateRecord(APIView):
             404: "Record does not exist!"
         }
     )
+    @query_budget(5)
     def patch(self, request):
         record_id = request.query_params.get('record_id')
 
@@ -133,9 +472,135 @@ class UpdateRecord(APIView):
         except Schedule.DoesNotExist:
             return Response('The record with this timeline does not exist!', status=status.HTTP_404_NOT_FOUND)
 
+        previous_slot = record.slot
+        previous_values = ScheduleChange.values(record)
         serializer = EditRecordTimelineSerializer(record, data=request.data, partial=True)
 
         if serializer.is_valid():
-            serializer.save()
+            try:
+                with transaction.atomic():
+                    serializer.save()
+                    schedule_changed(added=[record.slot], removed=[previous_slot],
+                                     changes=[ScheduleChange.updated(record, previous_values)])
+            except IntegrityError as error:
+                if not is_overlap_violation(error):
+                    raise
+                start = serializer.validated_data['start_time']
+                end = serializer.validated_data['end_time']
+                return Response({api_settings.NON_FIELD_ERRORS_KEY: [overlap_message(start, end)]},
+                                status=status.HTTP_400_BAD_REQUEST)
+
             return Response(serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class BulkDeleteRecords(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Delete a list of records by their IDs. Nothing is deleted if any record does not exist.",
+        request_body=BulkDeleteRecordsSerializer,
+        responses={
+            200: "The records were deleted successfully!",
+            400: "Record IDs are required to delete! Enter in correct format!",
+            404: "IDs of the records which already deleted or do not exist"
+        },
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER]
+    )
+    @idempotent
+    def delete(self, request):
+        serializer = BulkDeleteRecordsSerializer(data=request.data)
+
+        if not serializer.is_valid():
+            return Response('Record IDs are required to delete! Enter in correct format!',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        record_ids = set(serializer.validated_data['record_ids'])
+
+        with transaction.atomic():
+            records = list(Schedule.objects.filter(id__in=record_ids).select_for_update())
+
+            if len(records) == len(record_ids):
+                changes = [ScheduleChange.deleted(record) for record in records]
+                Schedule.objects.filter(id__in=record_ids).delete()
+                schedule_changed(removed=[record.slot for record in records], changes=changes)
+
+        if len(records) != len(record_ids):
+            return Response({'missing': sorted(record_ids - {record.id for record in records})},
+                            status=status.HTTP_404_NOT_FOUND)
+
+        return Response('The records were deleted successfully!', status=status.HTTP_200_OK)
+
+
+class BulkUpdateRecords(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Move a list of records to new time intervals in one transaction. The new intervals "
+                              "are validated against each other and against the rest of their days.",
+        request_body=BulkEditRecordTimelineSerializer(many=True),
+        responses={
+            200: BulkEditRecordTimelineSerializer(many=True),
+            400: "Validation errors or overlapping time intervals",
+            404: "IDs of the records which do not exist"
+        },
+        manual_parameters=[IDEMPOTENCY_KEY_PARAMETER]
+    )
+    @idempotent
+    def patch(self, request):
+        serializer = BulkEditRecordTimelineSerializer(data=request.data, many=True)
+
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = serializer.validated_data
+        record_ids = [change['id'] for change in changes]
+
+        if len(set(record_ids)) != len(record_ids):
+            return Response('Every record can be changed only once per request!', status=status.HTTP_400_BAD_REQUEST)
+
+        records = Schedule.objects.in_bulk(record_ids)
+        missing = [record_id for record_id in record_ids if record_id not in records]
+
+        if missing:
+            return Response({'missing': missing}, status=status.HTTP_404_NOT_FOUND)
+
+        previous_slots = [record.slot for record in records.values()]
+        previous_values = {record.id: ScheduleChange.values(record) for record in records.values()}
+        errors = {}
+        for position, change in enumerate(changes):
+            record = records[change['id']]
+            record.start_time = change.get('start_time', record.start_time)
+            record.end_time = change.get('end_time', record.end_time)
+
+            if record.start_time >= record.end_time:
+                errors[position] = {api_settings.NON_FIELD_ERRORS_KEY: ["End time must be greater than start time."]}
+
+        moved = [records[record_id] for record_id in record_ids]
+        if not errors:
+            intervals = [(record.day, record.start_time, record.end_time) for record in moved]
+
+            for conflict in find_batch_conflicts(intervals, exclude_ids=record_ids):
+                _, start, end = intervals[conflict]
+                errors[conflict] = {api_settings.NON_FIELD_ERRORS_KEY: [overlap_message(start, end)]}
+
+        if errors:
+            error_list = [{'index': position, 'errors': errors[position]} for position in sorted(errors)]
+            return Response({'errors': error_list}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    # Records may trade places, so the constraint is checked once all of them have moved.
+                    cursor.execute('SET CONSTRAINTS schedule_no_overlap DEFERRED')
+                    Schedule.objects.bulk_update(moved, ['start_time', 'end_time'])
+                    cursor.execute('SET CONSTRAINTS schedule_no_overlap IMMEDIATE')
+                entries = [ScheduleChange.updated(record, previous_values[record.id]) for record in moved]
+                schedule_changed(added=[record.slot for record in moved], removed=previous_slots, changes=entries)
+        except IntegrityError as error:
+            if not is_overlap_violation(error):
+                raise
+            return Response('Time intervals overlap with intervals changed concurrently! Repeat the request.',
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(BulkEditRecordTimelineSerializer(moved, many=True).data, status=status.HTTP_200_OK)
@@ -1,3 +1,4 @@
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
 
@@ -26,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'manage_schedule',
     'rest_framework',
     'rest_framework_simplejwt',
@@ -33,11 +35,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'manage_schedule.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'manage_schedule.routers.ReplicaRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -45,10 +49,23 @@ MIDDLEWARE = [
 ROOT_URLCONF = 'managing_weekly_schedule.urls'
 
 
+# StatelessJWTAuthentication trusts the token claims and never queries the user. Use
+# manage_schedule.authentication.CachedJWTAuthentication to query it at most once per SCHEDULE_AUTH_USER_CACHE_TIMEOUT,
+# or manage_schedule.authentication.AsyncJWTAuthentication to query it on every request.
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
-    )
+        'manage_schedule.authentication.StatelessJWTAuthentication',
+    ),
+    # JSON through orjson (byte-identical to DRF's renderer), plus MessagePack for internal services when installed.
+    'DEFAULT_RENDERER_CLASSES': (
+        'manage_schedule.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ) + (('manage_schedule.renderers.MessagePackRenderer',) if find_spec('msgpack') else ()),
+    'DEFAULT_PARSER_CLASSES': (
+        'manage_schedule.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ) + (('manage_schedule.parsers.MessagePackParser',) if find_spec('msgpack') else ()),
 }
 
 TEMPLATES = [
@@ -82,9 +99,69 @@ DATABASES = {
         'PASSWORD': 'simple_test_password',
         'HOST': 'db',
         'PORT': '5432',
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # Opt-in connection pool, shared by the threads of a process (needs `pip install "psycopg[binary,pool]"`).
+            # Connections idle for max_idle seconds are closed, requests wait at most timeout seconds for one, and
+            # CONN_HEALTH_CHECKS checks them when they leave the pool. /metrics reports the wait time and usage.
+            # 'pool': {'min_size': 2, 'max_size': 10, 'max_idle': 300, 'timeout': 10},
+        },
+    }
+}
+
+# A read replica of `default` (streaming replication): point HOST at it and list it in SCHEDULE_READ_REPLICAS. Tests get
+# a database of their own for it.
+DATABASES['replica'] = {**DATABASES['default'], 'TEST': {'NAME': 'test_weekly_schedule_replica'}}
+
+DATABASE_ROUTERS = ['manage_schedule.routers.ReplicaRouter']
+# Replica aliases the schedule reads of the weekly schedule, availability and export endpoints are spread over
+# (round-robin). Empty: everything reads from `default`.
+SCHEDULE_READ_REPLICAS = []
+# Seconds a replica may lag behind before it is skipped. After a write, the user reads from the primary for as long,
+# and payloads read from a replica are cached for as long only.
+SCHEDULE_REPLICA_MAX_LAG = 5
+# Seconds between health (reachability and lag) checks of a replica, per process.
+SCHEDULE_REPLICA_CHECK_INTERVAL = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Seconds a rendered schedule stays cached. Writes through the API and the admin invalidate it immediately, the
+# timeout only bounds staleness after writes made outside of them (e.g. from the shell).
+SCHEDULE_CACHE_TIMEOUT = 300
+
+# Seconds CachedJWTAuthentication keeps a user. Saving or deleting the user drops it immediately.
+SCHEDULE_AUTH_USER_CACHE_TIMEOUT = 60
+
+# Seconds the response to a write sent with an Idempotency-Key header is replayed to its retries. Run
+# `manage.py purge_idempotency_keys` periodically to delete the expired ones.
+SCHEDULE_IDEMPOTENCY_TTL = 24 * 60 * 60
+
+# Transport of the live events of /weekly-schedule/events/. InMemoryBackend reaches the clients of the writing process
+# only; with several processes use manage_schedule.events.PostgresBackend (LISTEN/NOTIFY).
+SCHEDULE_EVENTS_BACKEND = 'manage_schedule.events.InMemoryBackend'
+# Events buffered per connection. A client falling further behind is told to resync and disconnected.
+SCHEDULE_EVENTS_QUEUE_SIZE = 100
+# Seconds between keep-alive comments on an idle event stream.
+SCHEDULE_EVENTS_HEARTBEAT = 15
+
+# Per endpoint request metrics of this process, scraped from /metrics in the Prometheus text format.
+SCHEDULE_METRICS = True
+# When set, /metrics requires `Authorization: Bearer <token>`.
+SCHEDULE_METRICS_TOKEN = None
+# Requests slower than this many seconds are logged with their SQL (logger manage_schedule.slow_requests). None is off.
+SCHEDULE_SLOW_REQUEST_SECONDS = None
+
+# What a view running more queries than its budget (manage_schedule.query_budget) does: 'raise', 'log' or None.
+SCHEDULE_QUERY_BUDGET_ACTION = 'raise' if DEBUG else None
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -142,4 +219,13 @@ SWAGGER_SETTINGS = {
         },
     },
     'USE_SESSION_AUTH': False,
-}
\ No newline at end of file
+    # The UIs load the precomputed schema (manage_schedule.openapi) instead of generating it on every page view.
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+REDOC_SETTINGS = {
+    'SPEC_URL': ('schema-json', {'format': '.json'}),
+}
+
+# Where the OpenAPI schema is generated (by `manage.py generate_schema` or by the first schema request of a process).
+SCHEDULE_OPENAPI_DIR = BASE_DIR / 'openapi'
\ No newline at end of file
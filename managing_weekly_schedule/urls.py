@@ -1,27 +1,25 @@
 from django.contrib import admin
 from django.urls import path, re_path
 from rest_framework_simplejwt.views import TokenRefreshView, TokenObtainPairView
-from manage_schedule.views import GetWeekSchedule, CreateRecord, DeleteRecord, UpdateRecord
+from manage_schedule.views import (GetWeekSchedule, CreateRecord, DeleteRecord, UpdateRecord, BulkCreateRecords,
+                                   BulkDeleteRecords, BulkUpdateRecords, GetAvailability,
+                                   GetScheduleHeatmap, ExportSchedule, GetScheduleChanges)
+from manage_schedule.async_views import (AsyncGetWeekSchedule, AsyncCreateRecord, AsyncDeleteRecord, AsyncUpdateRecord,
+                                         AsyncScheduleEvents)
+from manage_schedule.metrics import metrics
+from manage_schedule.openapi import API_INFO, precomputed_schema
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
 
 schema_view = get_schema_view(
-    openapi.Info(
-        title="Your API Title",
-        default_version='v1',
-        description="API description",
-        terms_of_service="https://www.google.com/policies/terms/",
-        contact=openapi.Contact(email="contact@yourapi.com"),
-        license=openapi.License(name="BSD License"),
-    ),
+    API_INFO,
     public=True,
     permission_classes=[permissions.AllowAny,],
 )
 
 urlpatterns = [
-    re_path(r'^swagger(?P<format>\.json|\.yaml)$', schema_view.without_ui(cache_timeout=0), name='schema-json'),
+    re_path(r'^swagger(?P<format>\.json|\.yaml)$', precomputed_schema, name='schema-json'),
     path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
     path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
 
@@ -29,8 +27,22 @@ urlpatterns = [
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
 
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
     path('weekly-schedule/', GetWeekSchedule.as_view(), name='get-weekly-schedule'),
+    path('weekly-schedule/heatmap/', GetScheduleHeatmap.as_view(), name='get-schedule-heatmap'),
+    path('weekly-schedule/export/', ExportSchedule.as_view(), name='export-schedule'),
+    path('weekly-schedule/changes/', GetScheduleChanges.as_view(), name='get-schedule-changes'),
+    path('weekly-schedule/events/', AsyncScheduleEvents.as_view(), name='schedule-events'),
+    path('availability/', GetAvailability.as_view(), name='get-availability'),
     path('create-record/', CreateRecord.as_view(), name='create-record'),
+    path('create-records/bulk/', BulkCreateRecords.as_view(), name='create-records-bulk'),
     path('delete-record/', DeleteRecord.as_view(), name='delete-record'),
     path('update-record/', UpdateRecord.as_view(), name='update-record'),
+    path('delete-records/bulk/', BulkDeleteRecords.as_view(), name='delete-records-bulk'),
+    path('update-records/bulk/', BulkUpdateRecords.as_view(), name='update-records-bulk'),
+
+    path('async/weekly-schedule/', AsyncGetWeekSchedule.as_view(), name='async-get-weekly-schedule'),
+    path('async/create-record/', AsyncCreateRecord.as_view(), name='async-create-record'),
+    path('async/delete-record/', AsyncDeleteRecord.as_view(), name='async-delete-record'),
+    path('async/update-record/', AsyncUpdateRecord.as_view(), name='async-update-record'),
 ]